@@ -8,14 +8,30 @@ The backend will call http://localhost:11434/api/generate via HTTP.
 """
 
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from jinja2 import FileSystemBytecodeCache
+import anyio
+import asyncio
+import hashlib
+import httpx
 import logging
+import orjson
 import os
+import tempfile
+import time
 
 from app.routers import api, websocket
+from app.utils.static_files import CachedStaticFiles
+from app.utils.cors import SelectiveCORSMiddleware
+from app.utils.alt_svc import AltSvcMiddleware
+from app.utils.session_manager import session_manager
+from app.services.speech_service_simple import SpeechService
+from app.services.vision_service_simple import VisionService
+from app.services.vision_pool import create_vision_pool
+from app.utils import behavior_stats
 
 # Configure logging
 logging.basicConfig(
@@ -25,27 +41,106 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# /health never changes, so its body is encoded once
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "message": "AI Interviewer System is running"
+})
+_HEALTH_ETAG = f'"{hashlib.md5(_HEALTH_BYTES).hexdigest()}"'
+
+# Seconds a /system-status snapshot is reused before the services are queried again
+SYSTEM_STATUS_TTL_SECONDS = 5
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the long-lived service instances once at startup"""
+    # One shared threadpool serves run_in_threadpool calls and background tasks
+    anyio.to_thread.current_default_thread_limiter().total_tokens = int(os.getenv("THREADPOOL_SIZE", "40"))
+    
+    app.state.speech = SpeechService()
+    app.state.vision = VisionService()
+    # Frame analysis runs in worker processes when VISION_WORKERS is set
+    app.state.vision_pool = create_vision_pool()
+    websocket.vision_pool = app.state.vision_pool
+    
+    # One keep-alive HTTP client for every Ollama call, shared by the API and WebSocket interviewers
+    app.state.http = httpx.AsyncClient(
+        base_url=os.getenv('OLLAMA_URL', 'http://localhost:11434'),
+        timeout=httpx.Timeout(60.0, connect=2.0),
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    )
+    app.state.ai = api.ai_interviewer
+    app.state.ai.client = app.state.http
+    websocket.ai_interviewer.client = app.state.http
+    _system_status_snapshot.cache_clear()
+    # Behavior samples mark sessions dirty; this task writes them out in batches
+    session_flusher = asyncio.create_task(session_manager.run_flusher())
+    behavior_stats.warmup()
+    
+    # Static pages don't depend on the request, so render them once
+    app.state.index_html = templates.get_template("index.html").render({"request": None})
+    app.state.login_html = templates.get_template("login.html").render({"request": None})
+    app.state.ats_html = templates.get_template("ats.html").render({"request": None})
+    # Per-session pages only vary by session_id; keep the compiled templates
+    app.state.interview_tpl = templates.get_template("interview.html")
+    app.state.results_tpl = templates.get_template("results.html")
+    yield
+    
+    session_flusher.cancel()
+    await asyncio.gather(session_flusher, return_exceptions=True)
+    app.state.ai.client = None
+    websocket.ai_interviewer.client = None
+    await app.state.http.aclose()
+    await app.state.ai.aclose()
+    await websocket.ai_interviewer.aclose()
+    websocket.vision_pool = None
+    if app.state.vision_pool is not None:
+        app.state.vision_pool.shutdown(wait=False, cancel_futures=True)
+
 # Create FastAPI app
 app = FastAPI(
     title="AI Interviewer System",
     description="Local AI-powered interview system with voice and vision analysis",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Add CORS middleware. Origins come from ALLOWED_ORIGINS (comma-separated);
+# the UI itself is served same-origin, so this only matters for external clients.
+ALLOWED_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("ALLOWED_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000").split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify actual origins
+    SelectiveCORSMiddleware,
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# When an HTTP/2-capable front (Hypercorn, Caddy, nginx) is deployed, ALT_SVC advertises it,
+# e.g. ALT_SVC='h2=":443"; ma=86400', so browsers multiplex page, assets and polling on one connection.
+app.add_middleware(AltSvcMiddleware, alt_svc=os.getenv("ALT_SVC"))
 
-# Setup templates
-templates = Jinja2Templates(directory="app/templates")
+# Mount static files (serves precompressed .br/.gz variants when present)
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
+
+# Setup templates. Outside of development, templates are compiled once and the
+# bytecode is cached on disk instead of stat()ing the files on every render.
+DEV_MODE = os.getenv("ENV", "").lower() == "dev"
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "jinja_cache"))
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+
+templates = Jinja2Templates(
+    directory="app/templates",
+    auto_reload=DEV_MODE,
+    bytecode_cache=FileSystemBytecodeCache(directory=JINJA_CACHE_DIR),
+    cache_size=400
+)
 
 # Include routers
 app.include_router(api.router)
@@ -54,62 +149,92 @@ app.include_router(websocket.router)
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Home page - CV upload"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return HTMLResponse(request.app.state.index_html)
 
 @app.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
     """Login page UI (no auth backend yet)"""
-    return templates.TemplateResponse("login.html", {"request": request})
+    return HTMLResponse(request.app.state.login_html)
 
 @app.get("/interview/{session_id}", response_class=HTMLResponse)
 async def interview_page(request: Request, session_id: str):
     """Interview page with webcam and audio"""
-    return templates.TemplateResponse("interview.html", {
+    return HTMLResponse(request.app.state.interview_tpl.render({
         "request": request,
         "session_id": session_id
-    })
+    }))
 
 @app.get("/results/{session_id}", response_class=HTMLResponse)
 async def results_page(request: Request, session_id: str):
     """Results page showing interview summary"""
-    return templates.TemplateResponse("results.html", {
+    return HTMLResponse(request.app.state.results_tpl.render({
         "request": request,
         "session_id": session_id
-    })
+    }))
 
 @app.get("/ats", response_class=HTMLResponse)
 async def ats_page(request: Request):
     """ATS assessment page"""
-    return templates.TemplateResponse("ats.html", {"request": request})
+    return HTMLResponse(request.app.state.ats_html)
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "message": "AI Interviewer System is running"
-    }
-
-@app.get("/system-status")
-async def system_status():
-    """Get system status including AI services availability"""
-    from app.services.speech_service_simple import SpeechService
-    from app.services.vision_service_simple import VisionService
-    from app.services.ai_interviewer import AIInterviewer
+    return _conditional_json_response(request, _HEALTH_BYTES, _HEALTH_ETAG, max_age=1)
+
+@lru_cache(maxsize=1)
+def _system_status_snapshot(state, time_bucket: int) -> tuple:
+    """Build the encoded system status payload and its ETag; cached per TTL time bucket"""
+    speech_service = state.speech
+    vision_service = state.vision
+    ai_service = state.ai
     
-    speech_service = SpeechService()
-    vision_service = VisionService()
-    ai_service = AIInterviewer()
-    
-    return {
+    body = orjson.dumps({
         "speech_services": speech_service.get_speech_status(),
         "vision_services": vision_service.get_vision_status(),
         "llm_provider": "Ollama",
         "ollama_model": ai_service.ollama_model,
-        "ollama_url": ai_service.ollama_base_url
-    }
+        "ollama_url": ai_service.ollama_base_url,
+        "pipelines": websocket.get_pipeline_stats()
+    })
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+@app.get("/system-status")
+async def system_status(request: Request):
+    """Get system status including AI services availability"""
+    body, etag = _system_status_snapshot(request.app.state, int(time.monotonic() // SYSTEM_STATUS_TTL_SECONDS))
+    return _conditional_json_response(request, body, etag, max_age=SYSTEM_STATUS_TTL_SECONDS)
+
+def _conditional_json_response(request: Request, body: bytes, etag: str, max_age: int) -> Response:
+    """Serve pre-encoded JSON with Cache-Control/ETag, answering 304 when the client's copy is current"""
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    # uvloop is not available on Windows; fall back to the stdlib loop there
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    # One process: the session cache, the on-disk session index and journal seqs live in its
+    # memory, so several workers would 404 each other's sessions and corrupt journals
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        logger.warning("WEB_CONCURRENCY > 1 is not supported; starting a single worker")
+    # Keep idle browser connections open across page load, asset fetches and /system-status polls
+    keep_alive = int(os.getenv("KEEP_ALIVE_SECONDS", "75"))
+    # Frames are small, pre-encoded JSON; skip the per-connection zlib context unless asked for
+    ws_deflate = os.getenv("WS_PER_MESSAGE_DEFLATE", "0") == "1"
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop=loop,
+        http="httptools",
+        workers=1,
+        timeout_keep_alive=keep_alive,
+        ws_per_message_deflate=ws_deflate,
+        log_config=None
+    )
 
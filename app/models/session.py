@@ -1,7 +1,15 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, PrivateAttr, constr
+from typing import Annotated, List, Literal, Optional, Dict, Any, Iterator, Union, Callable, Tuple
 from datetime import datetime
 from enum import Enum
+import struct
+import threading
+import time
+import msgspec
+import numpy as np
+import orjson
+
+from app.utils.behavior_stats import summarize_behavior
 
 class SessionStatus(str, Enum):
     CREATED = "created"
@@ -18,13 +26,165 @@ class CVData(BaseModel):
     contact_info: Dict[str, str] = Field(default_factory=dict)
     parsed_at: datetime
 
-class InterviewMessage(BaseModel):
+class MessageIn(BaseModel):
+    """Request body for posting a message; validated once before it reaches the log"""
+    role: Literal["interviewer", "candidate"]
+    content: constr(strict=True, strip_whitespace=True, min_length=1, max_length=8000)
+
+# Messages and behavior samples are created per utterance / per video frame, so they
+# are msgspec Structs (slotted, C-level construction) rather than pydantic models.
+class InterviewMessage(msgspec.Struct, frozen=True, kw_only=True):
     role: str  # "interviewer" or "candidate"
     content: str
     timestamp: datetime
     audio_duration: Optional[float] = None
 
-class BehaviorMetrics(BaseModel):
+    def dict(self) -> Dict[str, Any]:
+        return msgspec.structs.asdict(self)
+
+_message_decoder = msgspec.json.Decoder(InterviewMessage)
+
+class MessageLog:
+    """Append-only transcript stored as newline-delimited orjson records.
+    
+    Appending encodes straight into a bytearray without pydantic validation;
+    InterviewMessage objects are only materialized when a record is read.
+    Behaves like a list of InterviewMessage for append/extend/len/indexing/iteration.
+    
+    The event loop appends while threadpool work (summaries, saves) reads the same log, so
+    appends, buffer views and the records() cache are guarded by one lock: resizing the
+    bytearray while a view is exported raises BufferError.
+    """
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offsets: List[int] = []
+        self._records: List[Dict[str, Any]] = []  # decoded prefix of the log, see records()
+        self._lock = threading.RLock()
+    
+    def add(self, role: str, content: str, timestamp: datetime, audio_duration: Optional[float] = None):
+        """Append a message from its fields (hot path, no model construction)"""
+        record = orjson.dumps({
+            'role': role,
+            'content': content,
+            'timestamp': timestamp,
+            'audio_duration': audio_duration
+        }) + b"\n"
+        with self._lock:
+            self._offsets.append(len(self._buffer))
+            self._buffer += record
+    
+    def append(self, message: Union["InterviewMessage", Dict[str, Any]]):
+        if isinstance(message, dict):
+            message = msgspec.convert(message, InterviewMessage)
+        self.add(message.role, message.content, message.timestamp, message.audio_duration)
+    
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+    
+    def _decode(self, index: int, decode: Callable[[memoryview], Any]) -> Any:
+        """Decode one record from a view that is released before the lock is"""
+        with self._lock:
+            start = self._offsets[index]
+            end = self._offsets[index + 1] - 1 if index + 1 < len(self._offsets) else len(self._buffer) - 1
+            with memoryview(self._buffer) as buffer, buffer[start:end] as view:
+                return decode(view)
+    
+    def _record(self, index: int) -> Dict[str, Any]:
+        return self._decode(index, orjson.loads)
+    
+    def _message(self, index: int) -> "InterviewMessage":
+        return self._decode(index, _message_decoder.decode)
+    
+    def __len__(self) -> int:
+        return len(self._offsets)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._message(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        return self._message(index)
+    
+    def __iter__(self) -> Iterator["InterviewMessage"]:
+        for i in range(len(self)):
+            yield self._message(i)
+    
+    def iter_messages(self) -> Iterator[Dict[str, Any]]:
+        """Yield records as plain dicts (timestamps as ISO strings) without building models"""
+        for i in range(len(self)):
+            yield self._record(i)
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self.iter_messages())
+    
+    def records(self) -> List[Dict[str, Any]]:
+        """Decoded records, cached across calls; only messages appended since the last call are decoded.
+        
+        The returned list is shared and must not be modified by the caller.
+        """
+        with self._lock:
+            cache = self._records
+            for i in range(len(cache), len(self._offsets)):
+                cache.append(self._record(i))
+            return cache
+    
+    def to_json(self) -> bytes:
+        """The log as a JSON array, spliced from the stored records without decoding them.
+        
+        orjson escapes newlines inside strings, so the record separators are the only raw
+        newlines in the buffer and can be swapped for commas.
+        """
+        if not self._buffer:
+            return b"[]"
+        return b"[" + bytes(self._buffer[:-1]).replace(b"\n", b",") + b"]"
+    
+    def to_bytes(self, start: int = 0, end: Optional[int] = None) -> bytes:
+        """Raw newline-delimited records, as stored in the buffer (optionally only bytes start:end)"""
+        return bytes(self._buffer[start:end])
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+    
+    def extend_bytes(self, data):
+        """Append raw records (to_bytes() output), recovering offsets from the record separators"""
+        with self._lock:
+            start = len(self._buffer)
+            self._buffer += data
+            end = len(self._buffer)
+            while start < end:
+                self._offsets.append(start)
+                start = self._buffer.index(b"\n", start) + 1
+    
+    @classmethod
+    def from_bytes(cls, data) -> "MessageLog":
+        """Rebuild a log from to_bytes() output"""
+        log = cls()
+        log.extend_bytes(data)
+        return log
+    
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+    
+    @classmethod
+    def validate(cls, value) -> "MessageLog":
+        """Accept an existing log or a list of InterviewMessage/dicts (e.g. loaded from storage)"""
+        if isinstance(value, cls):
+            return value
+        if value is None:
+            return cls()
+        if not isinstance(value, (list, tuple)):
+            raise TypeError("messages must be a list")
+        log = cls()
+        log.extend(value)
+        return log
+
+class BehaviorMetrics(msgspec.Struct, frozen=True, gc=False, kw_only=True):
     face_detected: bool = False
     eye_contact_score: float = 0.0
     posture_score: float = 0.0
@@ -32,12 +192,204 @@ class BehaviorMetrics(BaseModel):
     attention_score: float = 0.0
     timestamp: datetime
 
+    def dict(self) -> Dict[str, Any]:
+        return msgspec.structs.asdict(self)
+
+Score = Annotated[float, msgspec.Meta(ge=0.0, le=1.0)]
+
+class BehaviorSample(msgspec.Struct, kw_only=True):
+    """Client-reported behavior metrics; decoded with msgspec.convert(..., strict=False),
+    which coerces numeric strings and rejects out-of-range values"""
+    face_detected: bool = False
+    eye_contact_score: Score = 0.0
+    posture_score: Score = 0.0
+    gesture_count: Annotated[int, msgspec.Meta(ge=0, le=1000)] = 0
+    attention_score: Score = 0.0
+
+class BehaviorMetricsBuffer:
+    """Columnar (struct-of-arrays) storage for per-frame behavior metrics.
+    
+    Each metric lives in its own numpy column, so a sample costs ~40 bytes instead of
+    a full BehaviorMetrics object, and aggregates run in C. Behaves like a list of
+    BehaviorMetrics for append/len/iteration.
+    """
+    INITIAL_CAPACITY = 64
+    COLUMNS = ('face_detected', 'eye_contact', 'posture', 'gestures', 'attention', 'ts')
+    
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        capacity = max(int(capacity), 1)
+        self._size = 0
+        self.truncations = 0  # lets persistence tell that rows it already wrote were rolled back
+        self.face_detected = np.zeros(capacity, dtype=np.bool_)
+        self.eye_contact = np.zeros(capacity, dtype=np.float64)
+        self.posture = np.zeros(capacity, dtype=np.float64)
+        self.gestures = np.zeros(capacity, dtype=np.int32)
+        self.attention = np.zeros(capacity, dtype=np.float64)
+        self.ts = np.zeros(capacity, dtype=np.int64)  # epoch microseconds
+    
+    @property
+    def capacity(self) -> int:
+        return len(self.ts)
+    
+    def _grow(self):
+        """Double the capacity of every column, keeping the filled slots"""
+        new_capacity = self.capacity * 2
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+    
+    def add(self, face_detected: bool, eye_contact_score: float, posture_score: float,
+            gesture_count: int, attention_score: float, timestamp_us: int):
+        """Write one sample into the next free slot of each column (hot path, no Struct or datetime)"""
+        if self._size == self.capacity:
+            self._grow()
+        i = self._size
+        self.face_detected[i] = face_detected
+        self.eye_contact[i] = eye_contact_score
+        self.posture[i] = posture_score
+        self.gestures[i] = gesture_count
+        self.attention[i] = attention_score
+        self.ts[i] = timestamp_us
+        self._size += 1
+    
+    def append(self, metrics: Union["BehaviorMetrics", Dict[str, Any]]):
+        if isinstance(metrics, dict):
+            metrics = msgspec.convert(metrics, BehaviorMetrics)
+        self.add(
+            metrics.face_detected, metrics.eye_contact_score, metrics.posture_score,
+            metrics.gesture_count, metrics.attention_score,
+            int(metrics.timestamp.timestamp() * 1_000_000)
+        )
+    
+    def truncate(self, size: int):
+        """Drop samples past size (used to roll back a partially applied batch)"""
+        if size < self._size:
+            self._size = max(0, size)
+            # Only real drops count: they force the next save to be a full snapshot
+            self.truncations += 1
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __getitem__(self, index: int) -> "BehaviorMetrics":
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("behavior metrics index out of range")
+        return BehaviorMetrics(
+            face_detected=bool(self.face_detected[index]),
+            eye_contact_score=float(self.eye_contact[index]),
+            posture_score=float(self.posture[index]),
+            gesture_count=int(self.gestures[index]),
+            attention_score=float(self.attention[index]),
+            timestamp=datetime.fromtimestamp(int(self.ts[index]) / 1_000_000)
+        )
+    
+    def __iter__(self) -> Iterator["BehaviorMetrics"]:
+        for i in range(self._size):
+            yield self[i]
+    
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate the filled slots of each column"""
+        n = self._size
+        (eye, posture, attention, gestures, attention_min, attention_max,
+         attention_std, face_streak, overall) = summarize_behavior(
+            self.face_detected[:n], self.eye_contact[:n], self.posture[:n],
+            self.gestures[:n], self.attention[:n]
+        )
+        return {
+            'average_attention_score': attention,
+            'average_eye_contact_score': eye,
+            'average_posture_score': posture,
+            'total_gestures': gestures,
+            'min_attention_score': attention_min,
+            'max_attention_score': attention_max,
+            'attention_score_stddev': attention_std,
+            'longest_face_detected_streak': face_streak,
+            'overall_behavior_score': overall
+        }
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Materialize the samples as plain dicts (for persistence and summaries).
+        
+        Columns are converted to Python scalars in bulk with tolist() instead of building
+        and unpacking a BehaviorMetrics per row.
+        """
+        n = self._size
+        fromtimestamp = datetime.fromtimestamp
+        return [
+            {
+                'face_detected': face, 'eye_contact_score': eye, 'posture_score': posture,
+                'gesture_count': gestures, 'attention_score': attention,
+                'timestamp': fromtimestamp(ts / 1_000_000)
+            }
+            for face, eye, posture, gestures, attention, ts in zip(
+                self.face_detected[:n].tolist(), self.eye_contact[:n].tolist(), self.posture[:n].tolist(),
+                self.gestures[:n].tolist(), self.attention[:n].tolist(), self.ts[:n].tolist()
+            )
+        ]
+    
+    def columns(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[str, np.ndarray]]:
+        """Yield (name, filled slice) for each column, optionally only rows start:end"""
+        end = self._size if end is None else min(end, self._size)
+        for name in self.COLUMNS:
+            yield name, getattr(self, name)[start:end]
+    
+    def extend_columns(self, count: int, columns: Dict[str, np.ndarray]):
+        """Append count rows given as one array per column"""
+        if not count:
+            return
+        while self._size + count > self.capacity:
+            self._grow()
+        end = self._size + count
+        for name in self.COLUMNS:
+            getattr(self, name)[self._size:end] = columns[name]
+        self._size = end
+    
+    @classmethod
+    def from_columns(cls, size: int, columns: Dict[str, np.ndarray]) -> "BehaviorMetricsBuffer":
+        """Wrap existing column arrays (e.g. read-only np.frombuffer views) without copying.
+        
+        The buffer starts full, so the first append grows it into fresh writable arrays.
+        """
+        if not size:
+            return cls()
+        buffer = cls.__new__(cls)
+        buffer._size = size
+        buffer.truncations = 0
+        for name in cls.COLUMNS:
+            setattr(buffer, name, columns[name])
+        return buffer
+    
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+    
+    @classmethod
+    def validate(cls, value) -> "BehaviorMetricsBuffer":
+        """Accept an existing buffer or a list of BehaviorMetrics/dicts (e.g. loaded from storage)"""
+        if isinstance(value, cls):
+            return value
+        if value is None:
+            return cls()
+        if not isinstance(value, (list, tuple)):
+            raise TypeError("behavior_metrics must be a list")
+        buffer = cls(capacity=max(len(value), cls.INITIAL_CAPACITY))
+        for item in value:
+            buffer.append(item)
+        return buffer
+
+# Recent messages passed to the interviewer each turn; older ones are summarized
+LLM_HISTORY_WINDOW = 12
+
 class InterviewSession(BaseModel):
     session_id: str
     status: SessionStatus = SessionStatus.CREATED
     cv_data: Optional[CVData] = None
-    messages: List[InterviewMessage] = Field(default_factory=list)
-    behavior_metrics: List[BehaviorMetrics] = Field(default_factory=list)
+    messages: MessageLog = Field(default_factory=MessageLog)
+    behavior_metrics: BehaviorMetricsBuffer = Field(default_factory=BehaviorMetricsBuffer)
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     duration_seconds: int = 0
@@ -46,9 +398,215 @@ class InterviewSession(BaseModel):
     questions: List[str] = Field(default_factory=list)
     total_questions: int = 0
     questions_asked: int = 0
+    # Ollama KV context from the last generated turn, reused to skip re-encoding the prompt prefix
+    ollama_context: Optional[List[int]] = None
+    # ((message count, behavior metric count, truncations), cv_data, summary built from them)
+    _summary_cache: Optional[Tuple[Tuple[int, int, int], Optional[CVData], Dict[str, Any]]] = PrivateAttr(default=None)
+    # (summarized message count, summary record) for llm_history()
+    _history_summary: Optional[Tuple[int, Dict[str, Any]]] = PrivateAttr(default=None)
+    # (CVData instance, its dict()) so the CV is serialized once per upload
+    _cv_data_dump: Optional[Tuple[CVData, Dict[str, Any]]] = PrivateAttr(default=None)
+    # (start_time, time.monotonic() reading at that moment) for elapsed_seconds()
+    _start_monotonic: Optional[Tuple[datetime, float]] = PrivateAttr(default=None)
     
-    class Config:
-        use_enum_values = True
+    def llm_history(self, window: int = LLM_HISTORY_WINDOW) -> List[Dict[str, Any]]:
+        """Recent message records for the interviewer, bounded to fewer than 2 * window.
+        
+        Older messages are folded into one leading {'role': 'summary'} record listing the
+        questions already asked. It is rebuilt only each time another `window` messages
+        scroll out of view.
+        """
+        records = self.messages.records()
+        boundary = max(len(records) - window, 0) // window * window
+        if not boundary:
+            return records
+        cached = self._history_summary
+        if cached is None or cached[0] != boundary:
+            asked = [r['content'][:80] for r in records[:boundary] if r['role'] == 'interviewer']
+            summary = {
+                'role': 'summary',
+                'content': f"{boundary} earlier messages; questions already asked: " + "; ".join(asked[-8:])
+            }
+            cached = (boundary, summary)
+            self._history_summary = cached
+        return [cached[1], *records[boundary:]]
+    
+    def cv_data_dict(self) -> Dict[str, Any]:
+        """cv_data as a dict, cached until cv_data is replaced; callers must not modify it"""
+        if self.cv_data is None:
+            return {}
+        cached = self._cv_data_dump
+        if cached is None or cached[0] is not self.cv_data:
+            cached = (self.cv_data, self.cv_data.dict())
+            self._cv_data_dump = cached
+        return cached[1]
+    
+    def elapsed_seconds(self) -> float:
+        """Seconds since start_time (0 if not started), measured with time.monotonic().
+        
+        The wall clock is read once per start_time to anchor the monotonic reading, so
+        status polling does no datetime arithmetic.
+        """
+        if self.start_time is None:
+            return 0.0
+        anchor = self._start_monotonic
+        if anchor is None or anchor[0] is not self.start_time:
+            anchor = (self.start_time, time.monotonic() - (datetime.now() - self.start_time).total_seconds())
+            self._start_monotonic = anchor
+        return time.monotonic() - anchor[1]
+    
+    def get_summary(self, build: Callable[["InterviewSession"], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached summary, rebuilding it when its inputs changed.
+        
+        Inputs are the message and metric counts, metric truncations (a rollback can drop and
+        re-add samples without changing the count) and the CV object (replaced on re-upload).
+        """
+        key = (len(self.messages), len(self.behavior_metrics), self.behavior_metrics.truncations)
+        cached = self._summary_cache
+        if cached is not None and cached[0] == key and cached[1] is self.cv_data:
+            return cached[2]
+        summary = build(self)
+        self._summary_cache = (key, self.cv_data, summary)
+        return summary
+
+# Binary persistence: MAGIC, u32 header length, msgpack header, message log bytes,
+# then the raw bytes of each behavior column in header order.
+#
+# A record can also be a delta: it then holds only the messages and behavior rows
+# appended after messages_from bytes / behavior_from rows, and cv_data only if it
+# changed. A full record is simply the delta from an empty session. seq numbers the
+# records of a session, so a journal replayed over a newer snapshot skips old entries.
+SESSION_MAGIC = b"AIS\x01"
+_HEADER_LENGTH = struct.Struct("<I")
+
+class _SessionHeader(msgspec.Struct, kw_only=True):
+    session_id: str
+    status: str
+    cv_data: Optional[Dict[str, Any]] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    duration_seconds: int = 0
+    max_duration_seconds: int = 900
+    questions: List[str] = []
+    total_questions: int = 0
+    questions_asked: int = 0
+    ollama_context: Optional[List[int]] = None
+    messages_nbytes: int = 0
+    behavior_count: int = 0
+    columns: List[Tuple[str, str]] = []  # (column name, numpy dtype string)
+    seq: int = 0
+    messages_from: int = 0
+    behavior_from: int = 0
+
+_header_decoder = msgspec.msgpack.Decoder(_SessionHeader)
+
+def dump_session(session: "InterviewSession", seq: int = 0,
+                 messages_from: int = 0, messages_to: Optional[int] = None,
+                 behavior_from: int = 0, behavior_to: Optional[int] = None,
+                 include_cv: bool = True) -> bytes:
+    """Serialize a session to the compact binary format.
+    
+    The *_from / *_to bounds limit the record to message bytes and behavior rows in that
+    range (a delta); callers writing from another thread pass the ends they read beforehand.
+    """
+    messages = session.messages.to_bytes(messages_from, messages_to)
+    columns = list(session.behavior_metrics.columns(behavior_from, behavior_to))
+    header = msgspec.msgpack.encode(_SessionHeader(
+        session_id=session.session_id,
+        status=session.status.value,
+        cv_data=session.cv_data_dict() if include_cv and session.cv_data else None,  # cached per upload
+        start_time=session.start_time,
+        end_time=session.end_time,
+        duration_seconds=session.duration_seconds,
+        max_duration_seconds=session.max_duration_seconds,
+        questions=session.questions,
+        total_questions=session.total_questions,
+        questions_asked=session.questions_asked,
+        ollama_context=session.ollama_context,
+        messages_nbytes=len(messages),
+        behavior_count=len(columns[0][1]) if columns else 0,
+        columns=[(name, column.dtype.str) for name, column in columns],
+        seq=seq,
+        messages_from=messages_from,
+        behavior_from=behavior_from
+    ))
+    return b"".join([
+        SESSION_MAGIC, _HEADER_LENGTH.pack(len(header)), header, messages,
+        *[column.tobytes() for _, column in columns]
+    ])
+
+def _decode_record(data) -> Tuple[_SessionHeader, memoryview, Dict[str, np.ndarray]]:
+    """Split a dump_session() record into its header, message bytes and column views"""
+    if data[:len(SESSION_MAGIC)] != SESSION_MAGIC:
+        raise ValueError("not a binary session record")
+    view = memoryview(data)
+    offset = len(SESSION_MAGIC)
+    (header_length,) = _HEADER_LENGTH.unpack_from(view, offset)
+    offset += _HEADER_LENGTH.size
+    header = _header_decoder.decode(view[offset:offset + header_length])
+    offset += header_length
+    
+    messages = view[offset:offset + header.messages_nbytes]
+    offset += header.messages_nbytes
+    
+    columns = {}
+    for name, dtype in header.columns:
+        column = np.frombuffer(view, dtype=np.dtype(dtype), count=header.behavior_count, offset=offset)
+        columns[name] = column
+        offset += column.nbytes
+    return header, messages, columns
+
+def load_session(data: bytes) -> "InterviewSession":
+    """Deserialize a full dump_session() record; behavior columns are views into data"""
+    header, messages, columns = _decode_record(data)
+    return InterviewSession(
+        session_id=header.session_id,
+        status=SessionStatus(header.status),
+        cv_data=CVData(**header.cv_data) if header.cv_data else None,
+        messages=MessageLog.from_bytes(messages),
+        behavior_metrics=BehaviorMetricsBuffer.from_columns(header.behavior_count, columns),
+        start_time=header.start_time,
+        end_time=header.end_time,
+        duration_seconds=header.duration_seconds,
+        max_duration_seconds=header.max_duration_seconds,
+        questions=header.questions,
+        total_questions=header.total_questions,
+        questions_asked=header.questions_asked,
+        ollama_context=header.ollama_context
+    )
+
+def session_record_seq(data) -> int:
+    """The seq number of a dump_session() record"""
+    return _decode_record(data)[0].seq
+
+def apply_session_delta(session: "InterviewSession", data, seq: int) -> Optional[int]:
+    """Apply a delta record that directly follows record seq to session.
+    
+    Returns the delta's seq, seq itself for an entry the session already includes, or
+    None if the delta doesn't continue this session (a gap or a different base).
+    """
+    header, messages, columns = _decode_record(data)
+    if header.seq <= seq:
+        return seq
+    if (header.seq != seq + 1 or header.session_id != session.session_id
+            or header.messages_from != session.messages.nbytes
+            or header.behavior_from != len(session.behavior_metrics)):
+        return None
+    
+    session.messages.extend_bytes(messages)
+    session.behavior_metrics.extend_columns(header.behavior_count, columns)
+    if header.cv_data:
+        session.cv_data = CVData(**header.cv_data)
+    session.status = SessionStatus(header.status)
+    session.start_time = header.start_time
+    session.end_time = header.end_time
+    session.duration_seconds = header.duration_seconds
+    session.max_duration_seconds = header.max_duration_seconds
+    session.questions = header.questions
+    session.total_questions = header.total_questions
+    session.questions_asked = header.questions_asked
+    session.ollama_context = header.ollama_context
+    return header.seq
 
 class SessionSummary(BaseModel):
     session_id: str
@@ -58,4 +616,7 @@ class SessionSummary(BaseModel):
     behavior_summary: Dict[str, Any]
     transcript: List[InterviewMessage]
     recommendations: List[str]
+    
+    class Config:
+        arbitrary_types_allowed = True
 
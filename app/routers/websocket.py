@@ -1,85 +1,279 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import json
+import anyio
+import orjson
 import logging
 import asyncio
-import base64
-from typing import Dict, List
+import os
+import re
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
 
+from app.services.ai_interviewer import AIInterviewer
 from app.services.speech_service_simple import SpeechService
 from app.services.vision_service_simple import VisionService
-from app.utils.session_manager import SessionManager
+from app.utils.session_manager import session_manager
+from app.services.vision_pool import analyze_frame_bytes
 
 logger = logging.getLogger(__name__)
 
 # Initialize services
 speech_service = SpeechService()
 vision_service = VisionService()
-session_manager = SessionManager()
+# The app lifespan injects the shared keep-alive Ollama client
+ai_interviewer = AIInterviewer()
+# Set by the app lifespan when frame analysis runs in worker processes
+vision_pool: Optional[ProcessPoolExecutor] = None
+
+# Binary frames on /ws/{session_id}: one type byte, then the payload. Outgoing interviewer
+# audio also carries its sentence number as a big-endian uint32 after the type byte.
+FRAME_AUDIO = 0x01
+FRAME_VIDEO = 0x02
+FRAME_AI_AUDIO = 0x03
+AI_AUDIO_HEADER = struct.Struct('>BI')
+
+# Behavior metrics drift over seconds: only 1 in VISION_FRAME_SKIP + 1 frames is analyzed,
+# the others reuse the connection's last metrics
+VISION_FRAME_SKIP = max(0, int(os.getenv("VISION_FRAME_SKIP", "2")))
+
+# A reply sentence is complete once whitespace follows its closing punctuation
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?])\s+')
 
 router = APIRouter()
 
+def encode_message(message: dict) -> str:
+    """JSON text for a WebSocket message (orjson; numpy scalars from frame analysis included)"""
+    return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
 class ConnectionManager:
+    # Outbox tuning: messages per frame, and how long the writer waits for more to coalesce
+    MAX_BATCH_SIZE = 64
+    MAX_LINGER_SECONDS = 0.005
+    
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.outboxes: Dict[str, asyncio.Queue] = {}
+        self.writers: Dict[str, asyncio.Task] = {}
     
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
+        if session_id in self.active_connections:
+            self.disconnect(session_id)
+        outbox: asyncio.Queue = asyncio.Queue()
         self.active_connections[session_id] = websocket
+        self.outboxes[session_id] = outbox
+        self.writers[session_id] = asyncio.create_task(self._writer(session_id, websocket, outbox))
         logger.info(f"WebSocket connected for session: {session_id}")
     
-    def disconnect(self, session_id: str):
-        if session_id in self.active_connections:
+    def disconnect(self, session_id: str, websocket: Optional[WebSocket] = None):
+        """Tear down the session's connection; with websocket, only if it is still the current one"""
+        current = self.active_connections.get(session_id)
+        if current is not None and (websocket is None or current is websocket):
             del self.active_connections[session_id]
+            self.outboxes.pop(session_id, None)
+            writer = self.writers.pop(session_id, None)
+            if writer is not None and writer is not asyncio.current_task():
+                writer.cancel()
             logger.info(f"WebSocket disconnected for session: {session_id}")
     
     async def send_message(self, session_id: str, message: dict):
-        if session_id in self.active_connections:
-            try:
-                await self.active_connections[session_id].send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending message to {session_id}: {e}")
-                self.disconnect(session_id)
+        """Queue a message on the connection's outbox; the writer task sends it"""
+        outbox = self.outboxes.get(session_id)
+        if outbox is not None:
+            outbox.put_nowait(encode_message(message))
+    
+    async def send_bytes(self, session_id: str, frame: bytes):
+        """Queue a binary frame on the connection's outbox; it is sent on its own, never batched"""
+        outbox = self.outboxes.get(session_id)
+        if outbox is not None:
+            outbox.put_nowait(frame)
+    
+    async def broadcast(self, session_ids: Iterable[str], message: dict):
+        """Encode a message once and queue the same payload on several outboxes"""
+        payload = encode_message(message)
+        for session_id in session_ids:
+            outbox = self.outboxes.get(session_id)
+            if outbox is not None:
+                outbox.put_nowait(payload)
+    
+    async def _writer(self, session_id: str, websocket: WebSocket, outbox: asyncio.Queue):
+        """Drain the outbox, coalescing JSON-encoded messages into a single frame.
+        
+        Binary frames are sent as they come, after the text messages queued before them.
+        """
+        loop = asyncio.get_running_loop()
+        carried: Optional[Union[str, bytes]] = None
+        try:
+            while True:
+                first = carried if carried is not None else await outbox.get()
+                carried = None
+                if isinstance(first, bytes):
+                    await websocket.send_bytes(first)
+                    continue
+                batch = [first]
+                deadline = loop.time() + self.MAX_LINGER_SECONDS
+                while len(batch) < self.MAX_BATCH_SIZE:
+                    try:
+                        item = outbox.get_nowait()
+                    except asyncio.QueueEmpty:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(outbox.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    if isinstance(item, bytes):
+                        carried = item
+                        break
+                    batch.append(item)
+                
+                # Messages are queued already encoded. A lone message keeps its original shape;
+                # several are spliced into one batch frame without re-serializing them.
+                frame = batch[0] if len(batch) == 1 else '{"type":"batch","messages":[' + ','.join(batch) + ']}'
+                await websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message to {session_id}: {e}")
+            self.disconnect(session_id, websocket)
 
 manager = ConnectionManager()
 
+class InterviewPipeline:
+    """Per-connection processing stages linked by bounded queues.
+    
+    receiver -> video_queue -> vision stage -> outbox
+    receiver -> audio_queue -> speech stage -> transcript_queue -> interviewer stage -> outbox
+    
+    Stages run concurrently, so a slow LLM turn no longer holds up frame analysis,
+    and a full audio/transcript queue applies back-pressure to the receiver. Video keeps
+    only the newest frame: a stale one is replaced rather than analyzed late.
+    """
+    QUEUE_MAXSIZE = 8
+    
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.video_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.video_dropped = 0
+        self.video_frames = 0
+        self.last_metrics: Optional[Dict] = None
+        self.audio_queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_MAXSIZE)
+        self.transcript_queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_MAXSIZE)
+        self.tasks: List[asyncio.Task] = []
+    
+    def start(self):
+        self.tasks = [
+            asyncio.create_task(self._vision_stage()),
+            asyncio.create_task(self._speech_stage()),
+            asyncio.create_task(self._interviewer_stage())
+        ]
+    
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+    
+    def offer_frame(self, frame_data: bytes):
+        """Queue a video frame, replacing one still waiting for analysis"""
+        try:
+            self.video_queue.put_nowait(frame_data)
+        except asyncio.QueueFull:
+            self.video_queue.get_nowait()
+            self.video_queue.put_nowait(frame_data)
+            self.video_dropped += 1
+    
+    def queue_depths(self) -> Dict[str, int]:
+        return {
+            'video': self.video_queue.qsize(),
+            'video_dropped': self.video_dropped,
+            'audio': self.audio_queue.qsize(),
+            'transcript': self.transcript_queue.qsize()
+        }
+    
+    async def _vision_stage(self):
+        while True:
+            frame_data = await self.video_queue.get()
+            self.video_frames += 1
+            reuse = self.last_metrics is not None and self.video_frames % (VISION_FRAME_SKIP + 1) != 0
+            metrics = await handle_video_frame(
+                self.session_id, frame_data, cached_metrics=self.last_metrics if reuse else None
+            )
+            if metrics is not None:
+                self.last_metrics = metrics
+    
+    async def _speech_stage(self):
+        while True:
+            audio_data = await self.audio_queue.get()
+            transcribed_text = await handle_audio_message(self.session_id, audio_data)
+            if transcribed_text:
+                await self.transcript_queue.put(transcribed_text)
+    
+    async def _interviewer_stage(self):
+        while True:
+            transcribed_text = await self.transcript_queue.get()
+            await handle_transcript(self.session_id, transcribed_text)
+
+pipelines: Dict[str, InterviewPipeline] = {}
+
+def get_pipeline_stats() -> Dict[str, Dict[str, int]]:
+    """Queue depths of every live interview pipeline, keyed by session ID"""
+    return {session_id: pipeline.queue_depths() for session_id, pipeline in pipelines.items()}
+
 @router.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """Main WebSocket endpoint for real-time communication"""
     await manager.connect(websocket, session_id)
+    pipeline = InterviewPipeline(session_id)
+    pipeline.start()
+    pipelines[session_id] = pipeline
     
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            # Media arrives as binary frames; JSON text frames carry control messages
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
             
+            frame = received.get("bytes")
+            if frame is not None:
+                frame_type = frame[0] if frame else None
+                if frame_type == FRAME_AUDIO:
+                    await pipeline.audio_queue.put(frame[1:])
+                elif frame_type == FRAME_VIDEO:
+                    pipeline.offer_frame(frame[1:])
+                else:
+                    logger.warning(f"Unknown binary frame type: {frame_type}")
+                continue
+            
+            message = orjson.loads(received["text"])
             message_type = message.get('type')
             
-            if message_type == 'audio':
-                await handle_audio_message(session_id, message)
-            elif message_type == 'video':
-                await handle_video_frame(session_id, message)
-            elif message_type == 'ping':
+            if message_type == 'ping':
                 await manager.send_message(session_id, {'type': 'pong'})
             else:
                 logger.warning(f"Unknown message type: {message_type}")
                 
     except WebSocketDisconnect:
-        manager.disconnect(session_id)
+        manager.disconnect(session_id, websocket)
     except Exception as e:
         logger.error(f"WebSocket error for session {session_id}: {e}")
-        manager.disconnect(session_id)
+        manager.disconnect(session_id, websocket)
+    finally:
+        if pipelines.get(session_id) is pipeline:
+            del pipelines[session_id]
+        await pipeline.stop()
+        # Write what this connection changed now instead of waiting for the periodic flush
+        await anyio.to_thread.run_sync(session_manager.flush, session_id)
 
-async def handle_audio_message(session_id: str, message: dict):
-    """Handle audio data for speech-to-text processing"""
+async def handle_audio_message(session_id: str, audio_data: bytes) -> Optional[str]:
+    """Handle audio data for speech-to-text processing; returns the transcription"""
     try:
-        # Get audio data
-        audio_data_b64 = message.get('data')
-        if not audio_data_b64:
-            return
-        
-        # Decode base64 audio data
-        audio_data = base64.b64decode(audio_data_b64)
+        if not audio_data:
+            return None
         
         # Convert speech to text
         # Quick return if speech is disabled to avoid blocking UX
@@ -91,58 +285,8 @@ async def handle_audio_message(session_id: str, message: dict):
                 'type': 'transcription',
                 'text': transcribed_text
             })
-            
-            # Get session for AI response
-            session = session_manager.get_session(session_id)
-            if session and session.cv_data:
-                from app.services.ai_interviewer import AIInterviewer
-                ai_interviewer = AIInterviewer()
-
-                # Generate AI response off the event loop (blocking HTTP)
-                cv_data_dict = session.cv_data.dict()
-                conversation_history = [msg.dict() for msg in session.messages]
-
-                loop = asyncio.get_running_loop()
-                ai_response = await loop.run_in_executor(
-                    None,
-                    lambda: ai_interviewer.get_interview_response(
-                        cv_data_dict, conversation_history, transcribed_text
-                    )
-                )
-                
-                # Convert AI response to speech
-                audio_response_b64 = None
-                try:
-                    # TTS may block; keep event loop free
-                    audio_response = await speech_service.text_to_speech(ai_response)
-                    audio_response_b64 = base64.b64encode(audio_response).decode('utf-8') if audio_response else None
-                except Exception as tts_err:
-                    logger.warning(f"TTS unavailable or failed: {tts_err}")
-                
-                # Send AI response back to client
-                await manager.send_message(session_id, {
-                    'type': 'ai_response',
-                    'text': ai_response,
-                    'audio': audio_response_b64
-                })
-                
-                # Update session with messages
-                from app.models.session import InterviewMessage
-                from datetime import datetime
-                
-                user_message = InterviewMessage(
-                    role="candidate",
-                    content=transcribed_text,
-                    timestamp=datetime.now()
-                )
-                ai_message = InterviewMessage(
-                    role="interviewer",
-                    content=ai_response,
-                    timestamp=datetime.now()
-                )
-                
-                session.messages.extend([user_message, ai_message])
-                session_manager.update_session(session)
+            return transcribed_text
+        return None
         
     except Exception as e:
         logger.error(f"Error handling audio message: {e}")
@@ -150,20 +294,109 @@ async def handle_audio_message(session_id: str, message: dict):
             'type': 'error',
             'message': 'Error processing audio'
         })
+        return None
+
+def queue_speech(speech_queue: asyncio.Queue, sentence: str):
+    """Start synthesizing a sentence right away; the sender delivers results in order"""
+    sentence = sentence.strip()
+    if sentence:
+        speech_queue.put_nowait(asyncio.create_task(synthesize_speech(sentence)))
 
-async def handle_video_frame(session_id: str, message: dict):
-    """Handle video frame for computer vision analysis"""
+async def synthesize_speech(text: str) -> Optional[bytes]:
+    """TTS audio for one sentence, or None if TTS is unavailable"""
     try:
-        # Get video frame data
-        frame_data_b64 = message.get('data')
-        if not frame_data_b64:
+        return await speech_service.text_to_speech(text) or None
+    except Exception as tts_err:
+        logger.warning(f"TTS unavailable or failed: {tts_err}")
+        return None
+
+async def send_speech_chunks(session_id: str, speech_queue: asyncio.Queue):
+    """Send each sentence's audio as a binary FRAME_AI_AUDIO frame, in reply order, until None is queued"""
+    seq = 0
+    while True:
+        task = await speech_queue.get()
+        if task is None:
             return
+        audio = await task
+        if audio:
+            await manager.send_bytes(session_id, AI_AUDIO_HEADER.pack(FRAME_AI_AUDIO, seq) + audio)
+            seq += 1
+
+async def handle_transcript(session_id: str, transcribed_text: str):
+    """Generate and send the interviewer's reply to a transcribed candidate answer"""
+    try:
+        # Get session for AI response
+        session = await session_manager.aget_session(session_id)
+        if session and session.cv_data:
+            # Generate AI response (async HTTP, keeps the event loop free)
+            cv_data_dict = session.cv_data_dict()
+            conversation_history = session.llm_history()
+
+            # Stream the reply as it is generated so the client can render it early, and
+            # synthesize each finished sentence while the rest is still being generated
+            speech_queue: asyncio.Queue = asyncio.Queue()
+            audio_sender = asyncio.create_task(send_speech_chunks(session_id, speech_queue))
+            parts: List[str] = []
+            pending = ""
+            ollama_context = None
+            try:
+                async for delta, context in ai_interviewer.stream_interview_response(
+                    cv_data_dict, conversation_history, transcribed_text,
+                    ollama_context=session.ollama_context
+                ):
+                    if delta:
+                        parts.append(delta)
+                        await manager.send_message(session_id, {
+                            'type': 'ai_response_delta',
+                            'text': delta
+                        })
+                        *sentences, pending = SENTENCE_END_PATTERN.split(pending + delta)
+                        for sentence in sentences:
+                            queue_speech(speech_queue, sentence)
+                    if context is not None:
+                        ollama_context = context
+                queue_speech(speech_queue, pending)
+            finally:
+                speech_queue.put_nowait(None)
+            ai_response = "".join(parts).strip()
+            session.ollama_context = ollama_context
+            
+            # Audio went out as binary frames; the final frame carries the full text
+            await audio_sender
+            await manager.send_message(session_id, {
+                'type': 'ai_response',
+                'text': ai_response
+            })
+            
+            # Update session with messages
+            now = datetime.now()  # one clock read for the whole turn
+            session.messages.add(role="candidate", content=transcribed_text, timestamp=now)
+            session.messages.add(role="interviewer", content=ai_response, timestamp=now)
+            session_manager.mark_dirty(session)
         
-        # Decode base64 image data (simplified - no actual processing)
-        frame_data = base64.b64decode(frame_data_b64)
+    except Exception as e:
+        logger.error(f"Error generating interviewer response: {e}")
+        await manager.send_message(session_id, {
+            'type': 'error',
+            'message': 'Error processing audio'
+        })
+
+async def handle_video_frame(session_id: str, frame_data: bytes,
+                             cached_metrics: Optional[Dict] = None) -> Optional[Dict]:
+    """Handle video frame for computer vision analysis; reuses cached_metrics instead when given"""
+    try:
+        if not frame_data:
+            return None
         
-        # Analyze frame with computer vision (placeholder)
-        metrics = vision_service.analyze_frame(None)  # Pass None since we're not processing
+        # Analyze frame with computer vision. The encoded bytes cross the process
+        # boundary and are decoded in the worker, so no pixel array is pickled.
+        if cached_metrics is not None:
+            metrics = {**cached_metrics, 'timestamp': time.time()}
+        elif vision_pool is not None:
+            loop = asyncio.get_running_loop()
+            metrics = await loop.run_in_executor(vision_pool, analyze_frame_bytes, frame_data)
+        else:
+            metrics = vision_service.analyze_frame(None)  # Pass None since we're not processing
         
         # Send metrics back to client
         await manager.send_message(session_id, {
@@ -171,23 +404,20 @@ async def handle_video_frame(session_id: str, message: dict):
             'metrics': metrics
         })
         
-        # Update session with behavior metrics
-        session = session_manager.get_session(session_id)
+        # Update session with behavior metrics; written to storage by the periodic flush
+        session = await session_manager.aget_session(session_id)
         if session:
-            from app.models.session import BehaviorMetrics
-            from datetime import datetime
-            
-            behavior_metrics = BehaviorMetrics(
+            session.behavior_metrics.add(
                 face_detected=metrics.get('face_detected', False),
                 eye_contact_score=metrics.get('eye_contact_score', 0.0),
                 posture_score=metrics.get('posture_score', 0.0),
                 gesture_count=metrics.get('gesture_count', 0),
                 attention_score=metrics.get('attention_score', 0.0),
-                timestamp=datetime.now()
+                timestamp_us=time.time_ns() // 1000
             )
-            
-            session.behavior_metrics.append(behavior_metrics)
-            session_manager.update_session(session)
+            session_manager.mark_dirty(session)
+        
+        return metrics
         
     except Exception as e:
         logger.error(f"Error handling video frame: {e}")
@@ -211,10 +441,10 @@ async def audio_websocket(websocket: WebSocket, session_id: str):
             
             if transcribed_text and transcribed_text.strip():
                 # Send transcription
-                await websocket.send_json({
+                await websocket.send_text(encode_message({
                     'type': 'transcription',
                     'text': transcribed_text
-                })
+                }))
                 
     except WebSocketDisconnect:
         logger.info(f"Audio WebSocket disconnected for session: {session_id}")
@@ -235,10 +465,10 @@ async def video_websocket(websocket: WebSocket, session_id: str):
             metrics = vision_service.analyze_frame(None)
             
             # Send metrics
-            await websocket.send_json({
+            await websocket.send_text(encode_message({
                 'type': 'metrics',
                 'data': metrics
-            })
+            }))
                 
     except WebSocketDisconnect:
         logger.info(f"Video WebSocket disconnected for session: {session_id}")
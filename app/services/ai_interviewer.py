@@ -1,15 +1,127 @@
 import os
 import json
 import logging
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
 import random
-import requests
+import re
+import time
+import httpx
+import numpy as np
+import orjson
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+from app.models.session import BehaviorMetricsBuffer
 
 logger = logging.getLogger(__name__)
 
+# Columns aggregated when behavior metrics arrive as a list of dicts
+_BEHAVIOR_DTYPE = np.dtype([('attention', 'f8'), ('eye_contact', 'f8'), ('posture', 'f8'), ('gestures', 'i8')])
+
+SYSTEM_PROMPT = (
+    "You are an AI interviewer conducting a professional and interactive interview session. "
+    "Follow these rules strictly: "
+    "1) Always ask one question at a time and wait for the candidate's response. "
+    "2) Start with general background, then technical, situational, and project-specific questions based on the CV. "
+    "3) If the candidate's answer is brief, ask a clarifying follow-up for more detail. "
+    "4) If the answer is detailed, ask a deeper, related question to probe expertise. "
+    "5) Keep a natural, conversational tone. "
+    "6) Never provide answers yourself; only ask questions and react like an interviewer."
+)
+
+@lru_cache(maxsize=128)
+def build_cv_context(skills: Tuple[str, ...], education: Tuple[str, ...], experience: Tuple[str, ...]) -> str:
+    """CV block of the prompt; a session's CV doesn't change, so each turn reuses the same string"""
+    return (
+        f"Skills: {', '.join(skills)}\n"
+        f"Education: {'; '.join(education)}\n"
+        f"Experience: {'; '.join(experience)}"
+    )
+
+# Prompt history: at most this many recent messages, within a rough token budget
+HISTORY_TURNS = 5
+HISTORY_TOKEN_BUDGET = int(os.getenv('OLLAMA_HISTORY_TOKENS', '400'))
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about 4 characters per token for English text)"""
+    return (len(text) + 3) // 4
+
+# Interviewer-owned generator for question sampling and fallback replies
+_rng = random.Random()
+
+# Question pool for generate_interview_questions; skill templates are filled per CV skill
+BASE_QUESTIONS = (
+    "Tell me about yourself and your background.",
+    "What interests you most about this role?",
+    "Describe a challenging project you've worked on.",
+    "How do you handle working under pressure?",
+    "What are your greatest strengths?",
+    "Where do you see yourself in 5 years?",
+    "Why are you looking for a new opportunity?",
+    "How do you stay updated with industry trends?",
+    "Describe a time when you had to learn something new quickly.",
+    "What motivates you in your work?"
+)
+SKILL_QUESTION_TEMPLATES = (
+    "Can you tell me about your experience with {skill}?",
+    "How have you used {skill} in your previous projects?",
+    "What challenges have you faced while working with {skill}?"
+)
+
+# Local fallback: keyword sets per topic (with common inflections, matched as whole words)
+_TOKEN_RE = re.compile(r"[a-z]+")
+_EXPERIENCE_WORDS = frozenset({'experience', 'experiences', 'experienced', 'worked', 'project', 'projects'})
+_SKILL_WORDS = frozenset({'skill', 'skills', 'technology', 'technologies', 'tool', 'tools'})
+_CHALLENGE_WORDS = frozenset({'challenge', 'challenges', 'challenging', 'difficult', 'problem', 'problems'})
+_TEAM_WORDS = frozenset({'team', 'teams', 'teamwork', 'collaborate', 'collaborated', 'collaborating', 'collaboration'})
+_EXPERIENCE_FOLLOW_UPS = (
+    "That sounds interesting. Can you tell me more about the challenges you faced in that role?",
+    "What was the most rewarding aspect of that experience?",
+    "How did that experience prepare you for this role?",
+    "What would you do differently if you had to do it again?"
+)
+_CLARIFYING_QUESTIONS = (
+    "Could you expand on that a bit—what were your specific responsibilities?",
+    "What was the context and goal, and what part did you personally own?",
+    "Can you share a concrete example or metric to illustrate that?"
+)
+_PROBING_QUESTIONS = (
+    "What trade-offs did you consider, and why did you choose that approach?",
+    "How did you validate the results, and what would you improve next time?",
+    "Walk me through a tricky technical decision you made and its impact."
+)
+
+# After a connection failure, skip Ollama for this long and answer locally right away
+OLLAMA_RETRY_AFTER_SECONDS = float(os.getenv('OLLAMA_RETRY_AFTER', '30'))
+
+# How long a successful reply or probe vouches for Ollama in health checks
+OLLAMA_HEALTH_TTL_SECONDS = 60.0
+
+# Identical context-free prompts (health checks, retries, first turns) reuse the last Ollama reply
+RESPONSE_CACHE_SIZE = int(os.getenv('OLLAMA_RESPONSE_CACHE_SIZE', '512'))
+
 class AIInterviewer:
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        # Shared keep-alive client for Ollama; injected by the app lifespan
+        self.client = client
+        # Created on first use when nothing was injected, then kept for later turns
+        self._own_client: Optional[httpx.AsyncClient] = None
+        # time.monotonic() until which Ollama is treated as down (see _ollama_available)
+        self._ollama_down_until = 0.0
+        # time.monotonic() of the last successful Ollama reply or probe, and of the last probe
+        self._ollama_ok_at: Optional[float] = None
+        self._ollama_probed_at: Optional[float] = None
+        # Ollama replies keyed on the prompt alone, for context-free turns only (see _cache_key);
+        # local fallback replies are randomized and never cached
+        self._response_cache: "OrderedDict[str, Tuple[str, Optional[np.ndarray]]]" = OrderedDict()
         # Ollama configuration
         self.ollama_base_url = os.getenv('OLLAMA_URL', 'http://localhost:11434')
         self.ollama_generate_url = f"{self.ollama_base_url}/api/generate"
@@ -18,110 +130,212 @@ class AIInterviewer:
     
     def generate_interview_questions(self, cv_data: Dict) -> List[str]:
         """Generate interview questions based on CV data"""
-        base_questions = [
-            "Tell me about yourself and your background.",
-            "What interests you most about this role?",
-            "Describe a challenging project you've worked on.",
-            "How do you handle working under pressure?",
-            "What are your greatest strengths?",
-            "Where do you see yourself in 5 years?",
-            "Why are you looking for a new opportunity?",
-            "How do you stay updated with industry trends?",
-            "Describe a time when you had to learn something new quickly.",
-            "What motivates you in your work?"
-        ]
-        
-        # Add skill-specific questions
+        # Add skill-specific questions, focusing on the top 3 skills
         skills = cv_data.get('skills', [])
-        skill_questions = []
+        skill_questions = [template.format(skill=skill) for skill in skills[:3] for template in SKILL_QUESTION_TEMPLATES]
         
-        for skill in skills[:3]:  # Focus on top 3 skills
-            skill_questions.extend([
-                f"Can you tell me about your experience with {skill}?",
-                f"How have you used {skill} in your previous projects?",
-                f"What challenges have you faced while working with {skill}?"
-            ])
-        
-        all_questions = base_questions + skill_questions
-        return random.sample(all_questions, min(10, len(all_questions)))
+        all_questions = [*BASE_QUESTIONS, *skill_questions]
+        return _rng.sample(all_questions, min(10, len(all_questions)))
     
-    def get_interview_response(self, cv_data: Dict, conversation_history: List[Dict], user_message: str) -> str:
-        """Generate interviewer response based on conversation context"""
+    async def get_interview_response(self, cv_data: Dict, conversation_history: List[Dict], user_message: str,
+                                     ollama_context: Optional[List[int]] = None) -> Tuple[str, Optional[List[int]]]:
+        """Generate interviewer response based on conversation context.
+        
+        Returns the response text and the Ollama context to pass on the next turn
+        (None when the reply came from the local fallback, so the next call rebuilds
+        the full prompt from the conversation history).
+        """
         # Try Ollama first; if it fails, fall back to local response
-        ollama_response = self._get_ollama_response(cv_data, conversation_history, user_message)
+        ollama_response = await self._get_ollama_response(cv_data, conversation_history, user_message, ollama_context)
         if ollama_response is not None:
             return ollama_response
         fallback = self._get_local_response(cv_data, conversation_history, user_message)
-        return fallback
+        return fallback, None
     
-    def _get_ollama_response(self, cv_data: Dict, conversation_history: List[Dict], user_message: str) -> Optional[str]:
-        """Get response from local Ollama server. Returns None on failure."""
-        try:
-            # Try with provided model name and a sensible fallback (with/without :latest)
-            def candidate_models(model_name: str) -> List[str]:
-                names = [model_name]
-                if ":" in model_name:
-                    names.append(model_name.split(":", 1)[0])
-                else:
-                    names.append(f"{model_name}:latest")
-                # Ensure uniqueness while keeping order
-                seen = set()
-                ordered = []
-                for n in names:
-                    if n not in seen:
-                        seen.add(n)
-                        ordered.append(n)
-                return ordered
-
-            # Build a single prompt for the generate API
-            history_lines: List[str] = []
-            for msg in conversation_history[-5:]:  # Use last 5 messages for context
-                role = 'Interviewer' if msg.get('role') == 'interviewer' else 'Candidate'
-                content = msg.get('content', '')
-                history_lines.append(f"{role}: {content}")
+    async def stream_interview_response(self, cv_data: Dict, conversation_history: List[Dict], user_message: str,
+                                        ollama_context: Optional[List[int]] = None
+                                        ) -> AsyncIterator[Tuple[str, Optional[List[int]]]]:
+        """Yield (text delta, context) pairs as Ollama generates the reply.
+        
+        The context is None on every chunk except the final one. If Ollama is unavailable
+        before any text was produced, the local fallback response is yielded as one chunk.
+        """
+        prompt = self._build_prompt(cv_data, conversation_history, user_message, ollama_context)
+        cache_key = self._cache_key(prompt, ollama_context)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        produced = False
+        if not self._ollama_available():
+            yield self._get_local_response(cv_data, conversation_history, user_message), None
+            return
+        parts: List[str] = []
+        for model_name in self._candidate_models():
+            payload = self._generate_payload(model_name, prompt, ollama_context, stream=True)
+            try:
+                async with self._stream_generate(payload) as response:
+                    if response.status_code == 404:
+                        logger.warning(f"Ollama model '{model_name}' not found; trying next candidate if any")
+                        continue
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = orjson.loads(line)
+                        delta = chunk.get("response", "")
+                        done = chunk.get("done", False)
+                        if delta or done:
+                            produced = produced or bool(delta)
+                            parts.append(delta)
+                            yield delta, chunk.get("context") if done else None
+                        if done:
+                            self._store_response(cache_key, "".join(parts).strip(), chunk.get("context"))
+                            break
+                if produced:
+                    if model_name != self.ollama_model:
+                        logger.info(f"Ollama responded using fallback model name '{model_name}'")
+                    self._mark_ollama_ok()
+                    return
+            except httpx.TransportError as connect_err:
+                logger.error(f"Error streaming from Ollama for model '{model_name}': {connect_err}")
+                self._mark_ollama_down()
+                if produced:
+                    yield "", None
+                    return
+                break
+            except (httpx.HTTPError, orjson.JSONDecodeError) as stream_err:
+                logger.error(f"Error streaming from Ollama for model '{model_name}': {stream_err}")
+                if produced:
+                    # Part of the reply already went out; end it here rather than mixing in a fallback
+                    yield "", None
+                    return
 
-            context = (
-                "You are an AI interviewer conducting a professional and interactive interview session. "
-                "Follow these rules strictly: "
-                "1) Always ask one question at a time and wait for the candidate's response. "
-                "2) Start with general background, then technical, situational, and project-specific questions based on the CV. "
-                "3) If the candidate's answer is brief, ask a clarifying follow-up for more detail. "
-                "4) If the answer is detailed, ask a deeper, related question to probe expertise. "
-                "5) Keep a natural, conversational tone. "
-                "6) Never provide answers yourself; only ask questions and react like an interviewer."
-            )
+        logger.warning("Ollama returned no usable response for any candidate model; falling back to local patterns")
+        yield self._get_local_response(cv_data, conversation_history, user_message), None
+    
+    @staticmethod
+    def _cache_key(prompt: str, ollama_context: Optional[List[int]]) -> Optional[str]:
+        """Response cache key, or None for turns that continue a context.
+        
+        A context changes every turn, so such turns would almost never hit while pinning
+        thousands of token IDs per entry; only context-free prompts are cached.
+        """
+        return None if ollama_context else prompt
+    
+    def _cached_response(self, key: Optional[str]) -> Optional[Tuple[str, Optional[List[int]]]]:
+        """Return a cached Ollama reply for this prompt, if any"""
+        if key is None:
+            return None
+        cached = self._response_cache.get(key)
+        if cached is None:
+            return None
+        self._response_cache.move_to_end(key)
+        text, context = cached
+        return text, context.tolist() if context is not None else None
+    
+    def _store_response(self, key: Optional[str], text: str, context: Optional[List[int]]) -> Tuple[str, Optional[List[int]]]:
+        """Remember an Ollama reply, evicting the least recently used one when full"""
+        if text and key is not None:
+            # The returned context is kept packed: a list of Python ints costs ~4x as much
+            packed = np.asarray(context, dtype=np.int64) if context else None
+            self._response_cache[key] = (text, packed)
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        return text, context
+    
+    def _candidate_models(self) -> List[str]:
+        """Configured model name and a sensible fallback (with/without :latest)"""
+        model_name = self.ollama_model
+        names = [model_name]
+        if ":" in model_name:
+            names.append(model_name.split(":", 1)[0])
+        else:
+            names.append(f"{model_name}:latest")
+        # Ensure uniqueness while keeping order
+        return list(dict.fromkeys(names))
+    
+    def _build_prompt(self, cv_data: Dict, conversation_history: List[Dict], user_message: str,
+                      ollama_context: Optional[List[int]] = None) -> str:
+        """Build a single prompt for the generate API (just the new turn when a context is passed)"""
+        turn = f"Candidate: {user_message}\nInterviewer (ask just one question, 1-2 sentences, following the rules):"
+        if ollama_context:
+            return turn
+        
+        # A leading 'summary' record (see InterviewSession.llm_history) condenses older turns
+        earlier = ""
+        if conversation_history and conversation_history[0].get('role') == 'summary':
+            earlier = f"Earlier in the interview: {conversation_history[0].get('content', '')}\n\n"
+            conversation_history = conversation_history[1:]
+        
+        # Newest turns first, until the last HISTORY_TURNS messages or the token budget run out
+        history_lines: List[str] = []
+        budget = HISTORY_TOKEN_BUDGET
+        for msg in reversed(conversation_history[-HISTORY_TURNS:]):
+            role = 'Interviewer' if msg.get('role') == 'interviewer' else 'Candidate'
+            line = f"{role}: {msg.get('content', '')}"
+            cost = estimate_tokens(line)
+            if cost > budget:
+                if not history_lines:
+                    # Keep the tail of an overlong latest message rather than no history at all
+                    history_lines.append(f"{role}: ...{line[-budget * 4:]}")
+                break
+            history_lines.append(line)
+            budget -= cost
+        history_lines.reverse()
 
-            cv_context = (
-                f"Skills: {', '.join(cv_data.get('skills', []))}\n"
-                f"Education: {'; '.join(cv_data.get('education', [])[:2])}\n"
-                f"Experience: {'; '.join(cv_data.get('experience', [])[:2])}"
-            )
+        cv_context = build_cv_context(
+            tuple(cv_data.get('skills', [])),
+            tuple(cv_data.get('education', [])[:2]),
+            tuple(cv_data.get('experience', [])[:2])
+        )
 
-            conversation_block = "\n".join(history_lines)
-            prompt = (
-                f"{context}\n\nCV Context:\n{cv_context}\n\n"
-                f"Recent Conversation (last 5 turns):\n{conversation_block}\n\n"
-                f"Candidate: {user_message}\nInterviewer (ask just one question, 1-2 sentences, following the rules):"
-            )
+        conversation_block = "\n".join(history_lines)
+        return (
+            f"{SYSTEM_PROMPT}\n\nCV Context:\n{cv_context}\n\n{earlier}"
+            f"Recent Conversation:\n{conversation_block}\n\n"
+            f"{turn}"
+        )
+    
+    def _generate_payload(self, model_name: str, prompt: str, ollama_context: Optional[List[int]], stream: bool) -> Dict:
+        """Request body for /api/generate"""
+        payload = {
+            "model": model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "num_predict": 60,
+                "temperature": 0.7,
+                "top_p": 0.9
+            }
+        }
+        if ollama_context:
+            payload["context"] = ollama_context
+        return payload
+    
+    async def _get_ollama_response(self, cv_data: Dict, conversation_history: List[Dict], user_message: str,
+                                   ollama_context: Optional[List[int]] = None) -> Optional[Tuple[str, Optional[List[int]]]]:
+        """Get response and updated context from local Ollama server. Returns None on failure.
+        
+        With a context from a previous turn, the system prompt, CV and history are already
+        encoded in Ollama's KV state, so only the newest candidate turn is sent.
+        """
+        try:
+            prompt = self._build_prompt(cv_data, conversation_history, user_message, ollama_context)
+            cache_key = self._cache_key(prompt, ollama_context)
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                return cached
+            if not self._ollama_available():
+                return None
 
-            for model_name in candidate_models(self.ollama_model):
-                payload = {
-                    "model": model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "num_predict": 60,
-                        "temperature": 0.7,
-                        "top_p": 0.9
-                    }
-                }
+            for model_name in self._candidate_models():
+                payload = self._generate_payload(model_name, prompt, ollama_context, stream=False)
 
                 try:
-                    response = requests.post(
-                        self.ollama_generate_url,
-                        json=payload,
-                        timeout=8
-                    )
+                    response = await self._post_generate(payload)
                     response.raise_for_status()
                     data = response.json()
 
@@ -130,8 +344,9 @@ class AIInterviewer:
                     if isinstance(text, str) and text.strip():
                         if model_name != self.ollama_model:
                             logger.info(f"Ollama responded using fallback model name '{model_name}'")
-                        return text.strip()
-                except requests.exceptions.HTTPError as http_err:
+                        self._mark_ollama_ok()
+                        return self._store_response(cache_key, text.strip(), data.get("context"))
+                except httpx.HTTPStatusError as http_err:
                     # If model not found, try the next candidate
                     status = getattr(http_err.response, 'status_code', None)
                     body = None
@@ -145,17 +360,89 @@ class AIInterviewer:
                     else:
                         logger.error(f"Ollama HTTP error for model '{model_name}': {http_err}")
                         continue
-                except requests.exceptions.RequestException as req_err:
+                except httpx.TransportError as req_err:
+                    # Unreachable or timed out: another model name won't help
+                    logger.error(f"Error connecting to Ollama for model '{model_name}': {req_err}")
+                    self._mark_ollama_down()
+                    return None
+                except httpx.HTTPError as req_err:
                     logger.error(f"Error connecting to Ollama for model '{model_name}': {req_err}")
                     continue
 
             logger.warning("Ollama returned no usable response for any candidate model; falling back to local patterns")
             return None
 
-        except requests.exceptions.RequestException as http_error:
+        except httpx.HTTPError as http_error:
             logger.error(f"Error connecting to Ollama at {self.ollama_generate_url}: {http_error}")
             return None
     
+    def _ollama_available(self) -> bool:
+        """False while a recent connection failure is within OLLAMA_RETRY_AFTER_SECONDS"""
+        return time.monotonic() >= self._ollama_down_until
+    
+    def _mark_ollama_ok(self):
+        self._ollama_down_until = 0.0
+        self._ollama_ok_at = time.monotonic()
+    
+    def is_ready(self) -> bool:
+        """Whether replies can be produced; always true, the local patterns cover Ollama outages"""
+        return True
+    
+    async def ollama_status(self) -> str:
+        """'ok' or 'unreachable' for health checks, without generating anything.
+        
+        A reply within OLLAMA_HEALTH_TTL_SECONDS counts as ok; otherwise the server's model
+        list is fetched, at most once per TTL.
+        """
+        now = time.monotonic()
+        if self._ollama_ok_at is not None and now - self._ollama_ok_at < OLLAMA_HEALTH_TTL_SECONDS:
+            return "ok"
+        if not self._ollama_available():
+            return "unreachable"
+        if self._ollama_probed_at is None or now - self._ollama_probed_at >= OLLAMA_HEALTH_TTL_SECONDS:
+            self._ollama_probed_at = now
+            try:
+                response = await self._http().get(f"{self.ollama_base_url}/api/tags", timeout=httpx.Timeout(2, connect=1))
+                response.raise_for_status()
+                self._mark_ollama_ok()
+                return "ok"
+            except httpx.HTTPError as probe_err:
+                logger.warning(f"Ollama health probe failed: {probe_err}")
+                self._mark_ollama_down()
+        return "unreachable"
+    
+    def _mark_ollama_down(self):
+        self._ollama_down_until = time.monotonic() + OLLAMA_RETRY_AFTER_SECONDS
+        logger.warning(f"Ollama unreachable; using local responses for {OLLAMA_RETRY_AFTER_SECONDS:.0f}s")
+    
+    def _http(self) -> httpx.AsyncClient:
+        """The injected client, or a keep-alive client owned by this instance"""
+        if self.client is not None:
+            return self.client
+        if self._own_client is None or self._own_client.is_closed:
+            self._own_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(8.0, connect=1.0),
+                limits=httpx.Limits(max_keepalive_connections=4, max_connections=8)
+            )
+        return self._own_client
+    
+    async def _post_generate(self, payload: Dict) -> httpx.Response:
+        """POST to /api/generate, reusing the keep-alive connection"""
+        return await self._http().post(self.ollama_generate_url, json=payload, timeout=httpx.Timeout(8, connect=1))
+    
+    @asynccontextmanager
+    async def _stream_generate(self, payload: Dict) -> AsyncIterator[httpx.Response]:
+        """Streaming POST to /api/generate; the read timeout applies between chunks, not to the whole reply"""
+        timeout = httpx.Timeout(30, connect=1)
+        async with self._http().stream("POST", self.ollama_generate_url, json=payload, timeout=timeout) as response:
+            yield response
+    
+    async def aclose(self):
+        """Close the client this instance created, if any"""
+        if self._own_client is not None:
+            await self._own_client.aclose()
+            self._own_client = None
+    
     def _get_local_response(self, cv_data: Dict, conversation_history: List[Dict], user_message: str) -> str:
         """Generate local response using predefined patterns"""
         
@@ -165,49 +452,55 @@ class AIInterviewer:
         if message_count == 0:
             return "Let's begin the interview. First, please introduce yourself."
         
-        # Analyze user message for keywords
+        # Analyze user message for keywords: tokenize once, then one set intersection per topic
         user_lower = user_message.lower()
+        tokens = set(_TOKEN_RE.findall(user_lower))
         
-        if any(word in user_lower for word in ['experience', 'worked', 'project']):
-            follow_ups = [
-                "That sounds interesting. Can you tell me more about the challenges you faced in that role?",
-                "What was the most rewarding aspect of that experience?",
-                "How did that experience prepare you for this role?",
-                "What would you do differently if you had to do it again?"
-            ]
-            return random.choice(follow_ups)
+        if tokens & _EXPERIENCE_WORDS:
+            return _rng.choice(_EXPERIENCE_FOLLOW_UPS)
         
-        elif any(word in user_lower for word in ['skill', 'technology', 'tool']):
+        elif tokens & _SKILL_WORDS:
             skills = cv_data.get('skills', [])
             if skills:
-                skill = random.choice(skills)
+                skill = _rng.choice(skills)
                 return f"I see you mentioned {skill} in your CV. How would you rate your proficiency with it?"
             else:
                 return "What technologies or tools are you most comfortable working with?"
         
-        elif any(word in user_lower for word in ['challenge', 'difficult', 'problem']):
+        elif tokens & _CHALLENGE_WORDS:
             return "How do you typically approach problem-solving when faced with technical challenges?"
         
-        elif any(word in user_lower for word in ['team', 'collaborate', 'work with']):
+        elif tokens & _TEAM_WORDS or 'work with' in user_lower:
             return "Can you describe your preferred working style when collaborating with team members?"
         
         else:
             # Decide follow-up depth based on brevity (simple heuristic by word count)
             word_count = len(user_message.strip().split())
             if word_count < 20:
-                clarifying = [
-                    "Could you expand on that a bit—what were your specific responsibilities?",
-                    "What was the context and goal, and what part did you personally own?",
-                    "Can you share a concrete example or metric to illustrate that?"
-                ]
-                return random.choice(clarifying)
+                return _rng.choice(_CLARIFYING_QUESTIONS)
             else:
-                probing = [
-                    "What trade-offs did you consider, and why did you choose that approach?",
-                    "How did you validate the results, and what would you improve next time?",
-                    "Walk me through a tricky technical decision you made and its impact."
-                ]
-                return random.choice(probing)
+                return _rng.choice(_PROBING_QUESTIONS)
+    
+    @staticmethod
+    def _mentioned_skills(cv_skills: set, candidate_messages: List[Dict]) -> set:
+        """CV skills occurring as substrings of any candidate message, found in one scan of the answers"""
+        if not cv_skills or not candidate_messages:
+            return set()
+        # NUL never occurs in a skill, so no match can span two messages
+        text = "\0".join(msg['content'].lower() for msg in candidate_messages)
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for skill in cv_skills:
+                if skill:
+                    automaton.add_word(skill, skill)
+            mentioned = set()
+            if len(automaton):
+                automaton.make_automaton()
+                mentioned = {skill for _, skill in automaton.iter(text)}
+            if "" in cv_skills:
+                mentioned.add("")
+            return mentioned
+        return {skill for skill in cv_skills if skill in text}
     
     def generate_session_summary(self, session_data: Dict) -> Dict:
         """Generate a summary of the interview session"""
@@ -221,27 +514,34 @@ class AIInterviewer:
         
         # Simple CV match score based on skills mentioned
         cv_skills = set(skill.lower() for skill in cv_data.get('skills', []))
-        mentioned_skills = set()
-        
-        for msg in candidate_messages:
-            content_lower = msg['content'].lower()
-            for skill in cv_skills:
-                if skill in content_lower:
-                    mentioned_skills.add(skill)
+        mentioned_skills = self._mentioned_skills(cv_skills, candidate_messages)
         
         cv_match_score = len(mentioned_skills) / max(len(cv_skills), 1) * 100
         
         # Behavior summary
-        if behavior_metrics:
-            avg_attention = sum(m.get('attention_score', 0) for m in behavior_metrics) / len(behavior_metrics)
-            avg_eye_contact = sum(m.get('eye_contact_score', 0) for m in behavior_metrics) / len(behavior_metrics)
-            avg_posture = sum(m.get('posture_score', 0) for m in behavior_metrics) / len(behavior_metrics)
-            total_gestures = sum(m.get('gesture_count', 0) for m in behavior_metrics)
-        else:
+        if not len(behavior_metrics):
             avg_attention = 0
             avg_eye_contact = 0
             avg_posture = 0
             total_gestures = 0
+        elif isinstance(behavior_metrics, BehaviorMetricsBuffer):
+            # Columnar buffer: aggregate the numpy columns directly
+            stats = behavior_metrics.summary()
+            avg_attention = stats['average_attention_score']
+            avg_eye_contact = stats['average_eye_contact_score']
+            avg_posture = stats['average_posture_score']
+            total_gestures = stats['total_gestures']
+        else:
+            # One pass over the dicts into a structured array, then vectorized aggregates
+            arr = np.fromiter(
+                ((m.get('attention_score', 0), m.get('eye_contact_score', 0),
+                  m.get('posture_score', 0), m.get('gesture_count', 0)) for m in behavior_metrics),
+                dtype=_BEHAVIOR_DTYPE, count=len(behavior_metrics)
+            )
+            avg_attention = float(arr['attention'].mean())
+            avg_eye_contact = float(arr['eye_contact'].mean())
+            avg_posture = float(arr['posture'].mean())
+            total_gestures = int(arr['gestures'].sum())
         
         behavior_summary = {
             'average_attention_score': round(avg_attention, 2),
@@ -1,4 +1,5 @@
 import re
+import string
 import spacy
 from typing import List, Dict, Tuple
 from docx import Document
@@ -9,6 +10,28 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Contact patterns, compiled once
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')  # various formats
+LINKEDIN_PATTERN = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+
+# Characters EMAIL_PATTERN allows before the '@'
+EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '._%+-')
+
+def search_email(text: str):
+    """EMAIL_PATTERN.search(text), started at the local part before the first '@'.
+    
+    Every match contains an '@' and its local part can't span one, so no match begins
+    earlier; this skips the regex's attempt at each position of the text before it.
+    """
+    at = text.find('@')
+    if at == -1:
+        return None
+    start = at
+    while start and text[start - 1] in EMAIL_LOCAL_CHARS:
+        start -= 1
+    return EMAIL_PATTERN.search(text, start)
+
 class CVParser:
     def __init__(self):
         try:
@@ -20,14 +43,16 @@ class CVParser:
             self.nlp = None
             self.use_spacy = False
     
+    def is_ready(self) -> bool:
+        """Whether the parser can take uploads (basic parsing works without the spaCy model)"""
+        return True
+    
     def parse_pdf(self, file_content: bytes) -> str:
         """Extract text from PDF file"""
         try:
             pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            page_texts = (page.extract_text() for page in pdf_reader.pages)
+            return "\n".join(page_text for page_text in page_texts if page_text).strip()
         except Exception as e:
             logger.error(f"Error parsing PDF: {e}")
             return ""
@@ -36,10 +61,7 @@ class CVParser:
         """Extract text from DOCX file"""
         try:
             doc = Document(io.BytesIO(file_content))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
         except Exception as e:
             logger.error(f"Error parsing DOCX: {e}")
             return ""
@@ -48,23 +70,19 @@ class CVParser:
         """Extract contact information from CV text"""
         contact_info = {}
         
-        # Email pattern
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        if emails:
-            contact_info['email'] = emails[0]
+        # First match of each pattern
+        email = search_email(text)
+        if email:
+            contact_info['email'] = email.group(0)
         
-        # Phone pattern (various formats)
-        phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phones = re.findall(phone_pattern, text)
-        if phones:
-            contact_info['phone'] = ''.join(phones[0]) if isinstance(phones[0], tuple) else phones[0]
+        phone = PHONE_PATTERN.search(text)
+        if phone:
+            contact_info['phone'] = phone.group(0)
         
-        # LinkedIn pattern
-        linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-        linkedin = re.findall(linkedin_pattern, text, re.IGNORECASE)
+        # The literal check is much cheaper than a case-insensitive scan of a profile-less CV
+        linkedin = LINKEDIN_PATTERN.search(text) if 'linkedin.com/in/' in text.lower() else None
         if linkedin:
-            contact_info['linkedin'] = linkedin[0]
+            contact_info['linkedin'] = linkedin.group(0)
         
         return contact_info
     
@@ -81,11 +99,12 @@ class CVParser:
         ]
         
         text_lower = text.lower()
-        found_skills = []
+        # Lowercased skill -> display name, in the order found
+        found_skills = {}
         
         for skill in skill_keywords:
             if skill.lower() in text_lower:
-                found_skills.append(skill.title())
+                found_skills.setdefault(skill.lower(), skill.title())
         
         # Use spaCy for more advanced skill extraction if available
         if self.use_spacy and self.nlp:
@@ -93,10 +112,9 @@ class CVParser:
             for ent in doc.ents:
                 if ent.label_ in ['ORG', 'PRODUCT'] and len(ent.text) > 2:
                     skill_candidate = ent.text.strip()
-                    if skill_candidate.lower() not in [s.lower() for s in found_skills]:
-                        found_skills.append(skill_candidate)
+                    found_skills.setdefault(skill_candidate.lower(), skill_candidate)
         
-        return list(set(found_skills))[:20]  # Limit to 20 skills
+        return list(found_skills.values())[:20]  # Limit to 20 skills
     
     def extract_education(self, text: str) -> List[str]:
         """Extract education information from CV text"""
@@ -1,29 +1,159 @@
 import re
+import string
 from typing import List, Dict, Tuple
 from docx import Document
-import PyPDF2
 from datetime import datetime
 import io
 import logging
 
+# pypdf is the maintained successor of PyPDF2 and extracts text faster
+try:
+    from pypdf import PdfReader
+except ImportError:
+    from PyPDF2 import PdfReader
+
+try:
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Contact patterns, compiled once
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')  # various formats
+LINKEDIN_PATTERN = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+
+# Characters EMAIL_PATTERN allows before the '@'
+EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '._%+-')
+
+def search_email(text: str):
+    """EMAIL_PATTERN.search(text), started at the local part before the first '@'.
+    
+    Every match contains an '@' and its local part can't span one, so no match begins
+    earlier; this skips the regex's attempt at each position of the text before it.
+    """
+    at = text.find('@')
+    if at == -1:
+        return None
+    start = at
+    while start and text[start - 1] in EMAIL_LOCAL_CHARS:
+        start -= 1
+    return EMAIL_PATTERN.search(text, start)
+
+# Common skill keywords (lowercase), matched as whole words
+SKILL_KEYWORDS = (
+    'python', 'javascript', 'java', 'c++', 'c#', 'html', 'css', 'react', 'angular', 'vue',
+    'node.js', 'express', 'django', 'flask', 'spring', 'sql', 'mysql', 'postgresql',
+    'mongodb', 'redis', 'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'git', 'linux',
+    'machine learning', 'data science', 'artificial intelligence', 'deep learning',
+    'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy', 'matplotlib',
+    'project management', 'agile', 'scrum', 'leadership', 'communication', 'teamwork',
+    'problem solving', 'analytical', 'creative', 'detail oriented', 'time management'
+)
+
+# Alphanumeric runs; a purely alphanumeric keyword is a whole-word match exactly when it is one of them
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+# Keywords answered by a token set lookup, and the few (punctuation, spaces) that need a text search
+_SKILL_WORDS = frozenset(keyword for keyword in SKILL_KEYWORDS if keyword.isalnum())
+_SKILL_PHRASES = tuple(keyword for keyword in SKILL_KEYWORDS if not keyword.isalnum())
+
+EDUCATION_KEYWORDS = (
+    'bachelor', 'master', 'phd', 'doctorate', 'degree', 'university', 'college',
+    'school', 'institute', 'academy', 'certification', 'certificate', 'diploma',
+    'b.s.', 'b.a.', 'm.s.', 'm.a.', 'mba', 'ph.d.'
+)
+
+EXPERIENCE_KEYWORDS = (
+    'experience', 'work', 'employment', 'position', 'role', 'job',
+    'company', 'corporation', 'inc', 'ltd', 'llc', 'manager', 'developer',
+    'engineer', 'analyst', 'consultant', 'specialist', 'coordinator',
+    'director', 'senior', 'junior', 'lead', 'team lead'
+)
+
+def _build_automaton(keywords: tuple):
+    """Aho-Corasick automaton over keywords (each mapped to itself), or None without pyahocorasick"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+# One automaton per keyword set finds every occurrence in a single pass over the text
+_SKILL_AUTOMATON = _build_automaton(SKILL_KEYWORDS)
+_EDUCATION_AUTOMATON = _build_automaton(EDUCATION_KEYWORDS)
+_EXPERIENCE_AUTOMATON = _build_automaton(EXPERIENCE_KEYWORDS)
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] has no letter or digit directly before or after it"""
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+def _keywords_in(text_lower: str) -> set:
+    """SKILL_KEYWORDS occurring as whole words in text_lower ('java' doesn't count inside 'javascript')"""
+    if _SKILL_AUTOMATON is not None:
+        return {
+            keyword for end, keyword in _SKILL_AUTOMATON.iter(text_lower)
+            if _is_whole_word(text_lower, end - len(keyword) + 1, end + 1)
+        }
+    found = set(WORD_PATTERN.findall(text_lower)) & _SKILL_WORDS
+    for keyword in _SKILL_PHRASES:
+        start = text_lower.find(keyword)
+        while start != -1:
+            if _is_whole_word(text_lower, start, start + len(keyword)):
+                found.add(keyword)
+                break
+            start = text_lower.find(keyword, start + 1)
+    return found
+
+def _matching_lines(text: str, keywords: tuple, automaton, min_length: int, limit: int) -> List[str]:
+    """Stripped lines longer than min_length that contain any of keywords, at most limit of them"""
+    matches = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if len(line) <= min_length:  # Filter out very short lines
+            continue
+        line_lower = line.lower()
+        if automaton is not None:
+            hit = next(automaton.iter(line_lower), None) is not None
+        else:
+            hit = any(keyword in line_lower for keyword in keywords)
+        if hit:
+            matches.append(line)
+            if len(matches) == limit:
+                break
+    return matches
+
 class CVParser:
     def __init__(self):
         # Simple parser without spaCy dependency
         self.use_spacy = False
         logger.info("CV Parser initialized in simple mode (no spaCy)")
     
+    def is_ready(self) -> bool:
+        """Whether the parser can take uploads (the simple parser has nothing to load)"""
+        return True
+    
     def parse_pdf(self, file_content: bytes) -> str:
-        """Extract text from PDF file"""
+        """Extract text from PDF file, page by page (PyMuPDF when installed, else pypdf/PyPDF2)"""
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            return text.strip()
+            if PYMUPDF_AVAILABLE:
+                with pymupdf.open(stream=file_content, filetype="pdf") as doc:
+                    page_texts = (page.get_text() for page in doc)
+                    return "\n".join(page_text for page_text in page_texts if page_text).strip()
+            
+            pdf_reader = PdfReader(io.BytesIO(file_content))
+            page_texts = (page.extract_text() for page in pdf_reader.pages)
+            return "\n".join(page_text for page_text in page_texts if page_text).strip()
         except Exception as e:
             logger.error(f"Error parsing PDF: {e}")
             return ""
@@ -32,10 +162,7 @@ class CVParser:
         """Extract text from DOCX file"""
         try:
             doc = Document(io.BytesIO(file_content))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
         except Exception as e:
             logger.error(f"Error parsing DOCX: {e}")
             return ""
@@ -44,88 +171,37 @@ class CVParser:
         """Extract contact information from CV text"""
         contact_info = {}
         
-        # Email pattern
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        if emails:
-            contact_info['email'] = emails[0]
+        # First match of each pattern
+        email = search_email(text)
+        if email:
+            contact_info['email'] = email.group(0)
         
-        # Phone pattern (various formats)
-        phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phones = re.findall(phone_pattern, text)
-        if phones:
-            contact_info['phone'] = ''.join(phones[0]) if isinstance(phones[0], tuple) else phones[0]
+        phone = PHONE_PATTERN.search(text)
+        if phone:
+            contact_info['phone'] = phone.group(0)
         
-        # LinkedIn pattern
-        linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-        linkedin = re.findall(linkedin_pattern, text, re.IGNORECASE)
+        # The literal check is much cheaper than a case-insensitive scan of a profile-less CV
+        linkedin = LINKEDIN_PATTERN.search(text) if 'linkedin.com/in/' in text.lower() else None
         if linkedin:
-            contact_info['linkedin'] = linkedin[0]
+            contact_info['linkedin'] = linkedin.group(0)
         
         return contact_info
     
     def extract_skills(self, text: str) -> List[str]:
         """Extract skills from CV text"""
-        # Common skill keywords
-        skill_keywords = [
-            'python', 'javascript', 'java', 'c++', 'c#', 'html', 'css', 'react', 'angular', 'vue',
-            'node.js', 'express', 'django', 'flask', 'spring', 'sql', 'mysql', 'postgresql',
-            'mongodb', 'redis', 'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'git', 'linux',
-            'machine learning', 'data science', 'artificial intelligence', 'deep learning',
-            'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy', 'matplotlib',
-            'project management', 'agile', 'scrum', 'leadership', 'communication', 'teamwork',
-            'problem solving', 'analytical', 'creative', 'detail oriented', 'time management'
-        ]
-        
-        text_lower = text.lower()
-        found_skills = []
-        
-        for skill in skill_keywords:
-            if skill.lower() in text_lower:
-                found_skills.append(skill.title())
-        
-        return list(set(found_skills))[:20]  # Limit to 20 skills
+        found = _keywords_in(text.lower())
+        # Keyword-list order keeps the result (and the 20-skill cut) stable across runs
+        return [skill.title() for skill in SKILL_KEYWORDS if skill in found][:20]  # Limit to 20 skills
     
     def extract_education(self, text: str) -> List[str]:
         """Extract education information from CV text"""
-        education = []
-        
-        # Education keywords
-        education_keywords = [
-            'bachelor', 'master', 'phd', 'doctorate', 'degree', 'university', 'college',
-            'school', 'institute', 'academy', 'certification', 'certificate', 'diploma',
-            'b.s.', 'b.a.', 'm.s.', 'm.a.', 'mba', 'ph.d.'
-        ]
-        
-        lines = text.split('\n')
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in education_keywords):
-                if len(line.strip()) > 10:  # Filter out very short lines
-                    education.append(line.strip())
-        
-        return education[:5]  # Limit to 5 education entries
+        # Limit to 5 education entries
+        return _matching_lines(text, EDUCATION_KEYWORDS, _EDUCATION_AUTOMATON, 10, 5)
     
     def extract_experience(self, text: str) -> List[str]:
         """Extract work experience from CV text"""
-        experience = []
-        
-        # Experience keywords
-        experience_keywords = [
-            'experience', 'work', 'employment', 'position', 'role', 'job',
-            'company', 'corporation', 'inc', 'ltd', 'llc', 'manager', 'developer',
-            'engineer', 'analyst', 'consultant', 'specialist', 'coordinator',
-            'director', 'senior', 'junior', 'lead', 'team lead'
-        ]
-        
-        lines = text.split('\n')
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in experience_keywords):
-                if len(line.strip()) > 15:  # Filter out very short lines
-                    experience.append(line.strip())
-        
-        return experience[:10]  # Limit to 10 experience entries
+        # Limit to 10 experience entries
+        return _matching_lines(text, EXPERIENCE_KEYWORDS, _EXPERIENCE_AUTOMATON, 15, 10)
     
     def parse_cv(self, filename: str, file_content: bytes) -> Dict:
         """Main method to parse CV and extract all information"""
@@ -3,39 +3,158 @@ import io
 import logging
 import tempfile
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import wave
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL", "base")
+WHISPER_SAMPLE_RATE = 16000
+
+# Transcription and synthesis run off the event loop on bounded pools; the pyttsx3 engine
+# is not thread-safe, so speech is synthesized on a single thread
+STT_WORKERS = max(1, int(os.getenv("STT_WORKERS", "1")))
+stt_executor = ThreadPoolExecutor(max_workers=STT_WORKERS, thread_name_prefix="stt")
+tts_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+
+# PCM sample width in bytes -> (dtype, offset, scale) mapping samples onto [-1, 1)
+_PCM_FORMATS = {
+    1: (np.uint8, 128.0, 128.0),
+    2: (np.int16, 0.0, 32768.0),
+    4: (np.int32, 0.0, 2147483648.0),
+}
+
+# Whisper weights and the TTS engine are loaded once per process and shared by every SpeechService
+_load_lock = threading.Lock()
+_whisper_model = None
+_whisper_backend = None
+_whisper_attempted = False
+_tts_engine = None
+_tts_attempted = False
+
+def _load_faster_whisper():
+    """faster-whisper (CTranslate2) model with int8 weights, using fp16 compute on a GPU"""
+    import ctranslate2
+    from faster_whisper import WhisperModel
+    
+    if ctranslate2.get_cuda_device_count() > 0:
+        return WhisperModel(WHISPER_MODEL_NAME, device="cuda", compute_type="int8_float16")
+    return WhisperModel(WHISPER_MODEL_NAME, device="cpu", compute_type="int8")
+
+def _get_whisper_model():
+    """Load the Whisper model on first use, preferring faster-whisper; None when neither is installed"""
+    global _whisper_model, _whisper_backend, _whisper_attempted
+    with _load_lock:
+        if not _whisper_attempted:
+            _whisper_attempted = True
+            try:
+                try:
+                    _whisper_model = _load_faster_whisper()
+                    _whisper_backend = "faster-whisper"
+                except ImportError:
+                    import whisper
+                    _whisper_model = whisper.load_model(WHISPER_MODEL_NAME)
+                    _whisper_backend = "whisper"
+                logger.info(f"Whisper model loaded successfully ({_whisper_backend})")
+            except ImportError:
+                logger.warning("Whisper not available, STT will use placeholder")
+            except Exception as e:
+                logger.error(f"Error loading Whisper model: {e}")
+    return _whisper_model
+
+def _run_whisper(model, audio) -> str:
+    """Transcribe a 16 kHz float32 array or an audio file path with whichever backend loaded model"""
+    if _whisper_backend == "faster-whisper":
+        # Greedy decoding; the VAD filter skips silent stretches
+        segments, _ = model.transcribe(audio, beam_size=1, vad_filter=True)
+        return "".join(segment.text for segment in segments).strip()
+    return model.transcribe(audio)["text"].strip()
+
+def _get_tts_engine():
+    """Initialize the pyttsx3 engine on first use; None when TTS is unavailable"""
+    global _tts_engine, _tts_attempted
+    with _load_lock:
+        if not _tts_attempted:
+            _tts_attempted = True
+            try:
+                import pyttsx3
+                engine = pyttsx3.init()
+                engine.setProperty('rate', 150)  # Speed of speech
+                engine.setProperty('volume', 0.9)  # Volume level
+                _tts_engine = engine
+                logger.info("TTS engine initialized successfully")
+            except ImportError:
+                logger.warning("pyttsx3 not available, TTS will use placeholder")
+            except Exception as e:
+                logger.error(f"Error initializing TTS engine: {e}")
+    return _tts_engine
+
+def decode_wav(audio_data: bytes) -> Optional[np.ndarray]:
+    """Decode PCM WAV bytes into the float32 16 kHz mono array Whisper accepts; None for other formats"""
+    try:
+        with wave.open(io.BytesIO(audio_data), 'rb') as wav_file:
+            channels = wav_file.getnchannels()
+            sample_width = wav_file.getsampwidth()
+            sample_rate = wav_file.getframerate()
+            frames = wav_file.readframes(wav_file.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    if sample_width not in _PCM_FORMATS:
+        return None
+    
+    dtype, offset, scale = _PCM_FORMATS[sample_width]
+    samples = (np.frombuffer(frames, dtype=dtype).astype(np.float32) - offset) / scale
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if sample_rate != WHISPER_SAMPLE_RATE and samples.size:
+        # Linear interpolation onto the 16 kHz grid
+        target_size = int(round(samples.size * WHISPER_SAMPLE_RATE / sample_rate))
+        positions = np.arange(target_size) * (sample_rate / WHISPER_SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(samples.size), samples)
+    return samples.astype(np.float32, copy=False)
+
+def _build_silent_wav() -> bytes:
+    """Build a one-second silent WAV file"""
+    try:
+        # Create a short silent WAV file
+        sample_rate = 44100
+        duration = 1.0  # 1 second
+        frames = int(sample_rate * duration)
+        
+        # Create WAV file in memory
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            wav_file.setnchannels(1)  # Mono
+            wav_file.setsampwidth(2)  # 16-bit
+            wav_file.setframerate(sample_rate)
+            
+            # Write silent frames
+            silent_frames = b'\x00\x00' * frames
+            wav_file.writeframes(silent_frames)
+        
+        buffer.seek(0)
+        return buffer.read()
+        
+    except Exception as e:
+        logger.error(f"Error generating placeholder audio: {e}")
+        return b''
+
+# Built once; every fallback returns the same bytes
+PLACEHOLDER_AUDIO = _build_silent_wav()
+
 class SpeechService:
     def __init__(self):
-        self.whisper_available = False
-        self.tts_available = False
-        
         # Initialize Whisper for STT
-        try:
-            import whisper
-            self.whisper_model = whisper.load_model("base")
-            self.whisper_available = True
-            logger.info("Whisper model loaded successfully")
-        except ImportError:
-            logger.warning("Whisper not available, STT will use placeholder")
-        except Exception as e:
-            logger.error(f"Error loading Whisper model: {e}")
+        self.whisper_model = _get_whisper_model()
+        self.whisper_available = self.whisper_model is not None
         
         # Initialize TTS
-        try:
-            import pyttsx3
-            self.tts_engine = pyttsx3.init()
-            self.tts_engine.setProperty('rate', 150)  # Speed of speech
-            self.tts_engine.setProperty('volume', 0.9)  # Volume level
-            self.tts_available = True
-            logger.info("TTS engine initialized successfully")
-        except ImportError:
-            logger.warning("pyttsx3 not available, TTS will use placeholder")
-        except Exception as e:
-            logger.error(f"Error initializing TTS engine: {e}")
+        self.tts_engine = _get_tts_engine()
+        self.tts_available = self.tts_engine is not None
     
     async def speech_to_text(self, audio_data: bytes) -> str:
         """Convert speech audio to text"""
@@ -43,24 +162,29 @@ class SpeechService:
             return "[Speech recognition not available - placeholder text]"
         
         try:
-            # Save audio data to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-            
-            # Use Whisper to transcribe
-            result = self.whisper_model.transcribe(temp_file_path)
-            transcribed_text = result["text"].strip()
-            
-            # Clean up temporary file
-            os.unlink(temp_file_path)
-            
+            loop = asyncio.get_running_loop()
+            transcribed_text = await loop.run_in_executor(stt_executor, self._transcribe, audio_data)
             return transcribed_text if transcribed_text else "[No speech detected]"
             
         except Exception as e:
             logger.error(f"Error in speech-to-text conversion: {e}")
             return "[Error in speech recognition]"
     
+    def _transcribe(self, audio_data: bytes) -> str:
+        """Run Whisper on WAV audio in memory, going through a temporary file (ffmpeg) for other formats"""
+        samples = decode_wav(audio_data)
+        if samples is not None:
+            return _run_whisper(self.whisper_model, samples)
+        
+        # Save audio data to temporary file
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_file.write(audio_data)
+            temp_file_path = temp_file.name
+        try:
+            return _run_whisper(self.whisper_model, temp_file_path)
+        finally:
+            os.unlink(temp_file_path)
+    
     async def text_to_speech(self, text: str) -> bytes:
         """Convert text to speech audio"""
         if not self.tts_available:
@@ -68,52 +192,32 @@ class SpeechService:
             return self._generate_placeholder_audio()
         
         try:
-            # Create temporary file for audio output
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file_path = temp_file.name
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(tts_executor, self._synthesize, text)
             
+        except Exception as e:
+            logger.error(f"Error in text-to-speech conversion: {e}")
+            return self._generate_placeholder_audio()
+    
+    def _synthesize(self, text: str) -> bytes:
+        """Render text to WAV bytes with the pyttsx3 engine (blocking)"""
+        # Create temporary file for audio output
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_file_path = temp_file.name
+        try:
             # Generate speech
             self.tts_engine.save_to_file(text, temp_file_path)
             self.tts_engine.runAndWait()
             
             # Read the generated audio file
             with open(temp_file_path, 'rb') as audio_file:
-                audio_data = audio_file.read()
-            
-            # Clean up temporary file
+                return audio_file.read()
+        finally:
             os.unlink(temp_file_path)
-            
-            return audio_data
-            
-        except Exception as e:
-            logger.error(f"Error in text-to-speech conversion: {e}")
-            return self._generate_placeholder_audio()
     
     def _generate_placeholder_audio(self) -> bytes:
-        """Generate a short placeholder audio file"""
-        try:
-            # Create a short silent WAV file
-            sample_rate = 44100
-            duration = 1.0  # 1 second
-            frames = int(sample_rate * duration)
-            
-            # Create WAV file in memory
-            buffer = io.BytesIO()
-            with wave.open(buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(sample_rate)
-                
-                # Write silent frames
-                silent_frames = b'\x00\x00' * frames
-                wav_file.writeframes(silent_frames)
-            
-            buffer.seek(0)
-            return buffer.read()
-            
-        except Exception as e:
-            logger.error(f"Error generating placeholder audio: {e}")
-            return b''
+        """Return the short placeholder audio file"""
+        return PLACEHOLDER_AUDIO
     
     def is_speech_available(self) -> bool:
         """Check if speech services are available"""
@@ -123,6 +227,7 @@ class SpeechService:
         """Get status of speech services"""
         return {
             'whisper_available': self.whisper_available,
+            'whisper_backend': _whisper_backend,
             'tts_available': self.tts_available,
             'fully_functional': self.whisper_available and self.tts_available
         }
@@ -0,0 +1,62 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-worker-process state, set up once by _init_vision
+_vision_service = None
+_cv2 = None
+_np = None
+
+def _init_vision():
+    """Worker initializer: load the vision backend once per process"""
+    global _vision_service, _cv2, _np
+    try:
+        import cv2
+        import numpy as np
+        from app.services.vision_service import VisionService
+        _cv2, _np = cv2, np
+    except ImportError:
+        from app.services.vision_service_simple import VisionService
+        _vision_service = VisionService()
+        return
+    # Any worker may get any session's frame, so no landmark tracking state between frames
+    _vision_service = VisionService(static_image_mode=True)
+
+def analyze_frame_bytes(frame_data: bytes) -> Dict:
+    """Decode an encoded (JPEG/PNG) frame inside the worker and analyze it"""
+    if _cv2 is None:
+        return _vision_service.analyze_frame(None)
+    frame = _cv2.imdecode(_np.frombuffer(frame_data, dtype=_np.uint8), _cv2.IMREAD_COLOR)
+    if frame is None:
+        return _vision_service._get_default_metrics()
+    return _vision_service.analyze_frame(frame)
+
+def _worker_count() -> int:
+    """VISION_WORKERS: 0 (default) analyzes in-process, 'auto' uses all cores but one"""
+    value = os.getenv("VISION_WORKERS", "0").strip().lower()
+    if value == "auto":
+        return max((os.cpu_count() or 2) - 1, 1)
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        logger.warning(f"Invalid VISION_WORKERS value '{value}', analyzing frames in-process")
+        return 0
+
+def create_vision_pool() -> Optional[ProcessPoolExecutor]:
+    """Create the frame-analysis process pool, or None when disabled"""
+    workers = _worker_count()
+    if not workers:
+        return None
+    # forkserver avoids forking the event loop and open sockets; Windows only has spawn
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(method),
+        initializer=_init_vision
+    )
+    logger.info(f"Vision process pool started with {workers} workers ({method})")
+    return pool
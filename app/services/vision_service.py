@@ -1,3 +1,5 @@
+import math
+import os
 import cv2
 import numpy as np
 import logging
@@ -6,35 +8,48 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Frames are shrunk to this short edge before detection; the metrics only use relative positions
+ANALYSIS_SHORT_EDGE = int(os.getenv("VISION_SHORT_EDGE", "360"))
+
+# Run the Haar fallback through OpenCV's transparent API (OpenCL) when a device is present
+USE_OPENCL = os.getenv("VISION_OPENCL", "1") == "1"
+
+def downscale_frame(frame: np.ndarray, short_edge: int = ANALYSIS_SHORT_EDGE) -> np.ndarray:
+    """Resize frame so its shorter side is short_edge pixels; smaller frames are returned as is"""
+    height, width = frame.shape[:2]
+    scale = short_edge / min(height, width)
+    if scale >= 1:
+        return frame
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+def eye_contact_score(face_center_x: float, face_center_y: float) -> float:
+    """1.0 for a face centered in the frame, falling to 0.0 half a frame away (relative coordinates)"""
+    return max(0.0, 1.0 - 2.0 * math.hypot(face_center_x - 0.5, face_center_y - 0.5))
+
 class VisionService:
-    def __init__(self):
+    def __init__(self, static_image_mode: bool = False):
         self.mediapipe_available = False
         self.face_cascade = None
+        self.use_opencl = False
+        self._rgb_buffer = None  # Reused RGB copy of the frame fed to MediaPipe
         
         # Try to initialize MediaPipe
         try:
             import mediapipe as mp
-            self.mp_face_detection = mp.solutions.face_detection
-            self.mp_pose = mp.solutions.pose
-            self.mp_hands = mp.solutions.hands
+            self.mp_holistic = mp.solutions.holistic
             self.mp_drawing = mp.solutions.drawing_utils
             
-            self.face_detection = self.mp_face_detection.FaceDetection(
-                model_selection=0, min_detection_confidence=0.5
-            )
-            self.pose = self.mp_pose.Pose(
-                static_image_mode=False,
-                model_complexity=1,
+            # One fused graph for face, pose and hands; the lite model is plenty for these metrics
+            self.holistic = self.mp_holistic.Holistic(
+                # Tracking carries landmarks across frames; pass True when frames from
+                # different sessions share this instance
+                static_image_mode=static_image_mode,
+                model_complexity=0,
                 smooth_landmarks=True,
                 min_detection_confidence=0.5,
                 min_tracking_confidence=0.5
             )
-            self.hands = self.mp_hands.Hands(
-                static_image_mode=False,
-                max_num_hands=2,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
             
             self.mediapipe_available = True
             logger.info("MediaPipe initialized successfully")
@@ -46,7 +61,9 @@ class VisionService:
                 self.face_cascade = cv2.CascadeClassifier(
                     cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
                 )
-                logger.info("OpenCV face detection initialized")
+                self.use_opencl = USE_OPENCL and cv2.ocl.haveOpenCL()
+                cv2.ocl.setUseOpenCL(self.use_opencl)
+                logger.info(f"OpenCV face detection initialized (OpenCL: {self.use_opencl})")
             except Exception as e:
                 logger.error(f"Error initializing OpenCV face detection: {e}")
         except Exception as e:
@@ -54,6 +71,8 @@ class VisionService:
     
     def analyze_frame(self, frame: np.ndarray) -> Dict:
         """Analyze a video frame for behavioral metrics"""
+        if frame is not None and frame.size:
+            frame = downscale_frame(frame)
         if self.mediapipe_available:
             return self._analyze_with_mediapipe(frame)
         else:
@@ -62,7 +81,7 @@ class VisionService:
     def _analyze_with_mediapipe(self, frame: np.ndarray) -> Dict:
         """Analyze frame using MediaPipe"""
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            rgb_frame = self._to_rgb(frame)
             height, width = frame.shape[:2]
             
             metrics = {
@@ -74,38 +93,37 @@ class VisionService:
                 'timestamp': time.time()
             }
             
+            results = self.holistic.process(rgb_frame)
+            
             # Face detection
-            face_results = self.face_detection.process(rgb_frame)
-            if face_results.detections:
+            if results.face_landmarks:
                 metrics['face_detected'] = True
                 
-                # Calculate eye contact score based on face position
-                detection = face_results.detections[0]
-                bbox = detection.location_data.relative_bounding_box
-                face_center_x = bbox.xmin + bbox.width / 2
-                face_center_y = bbox.ymin + bbox.height / 2
+                # Calculate eye contact score based on face position (center of the landmarks' bounding box)
+                face_x = [point.x for point in results.face_landmarks.landmark]
+                face_y = [point.y for point in results.face_landmarks.landmark]
+                face_center_x = (min(face_x) + max(face_x)) / 2
+                face_center_y = (min(face_y) + max(face_y)) / 2
                 
                 # Eye contact score based on how centered the face is
-                center_distance = np.sqrt((face_center_x - 0.5)**2 + (face_center_y - 0.5)**2)
-                metrics['eye_contact_score'] = max(0, 1 - center_distance * 2)
+                metrics['eye_contact_score'] = eye_contact_score(face_center_x, face_center_y)
             
-            # Pose detection for posture analysis
-            pose_results = self.pose.process(rgb_frame)
-            if pose_results.pose_landmarks:
-                landmarks = pose_results.pose_landmarks.landmark
+            # Pose landmarks for posture analysis
+            if results.pose_landmarks:
+                landmarks = results.pose_landmarks.landmark
                 
                 # Calculate posture score based on shoulder alignment
-                left_shoulder = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER]
-                right_shoulder = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER]
+                left_shoulder = landmarks[self.mp_holistic.PoseLandmark.LEFT_SHOULDER]
+                right_shoulder = landmarks[self.mp_holistic.PoseLandmark.RIGHT_SHOULDER]
                 
                 if left_shoulder.visibility > 0.5 and right_shoulder.visibility > 0.5:
                     shoulder_diff = abs(left_shoulder.y - right_shoulder.y)
                     metrics['posture_score'] = max(0, 1 - shoulder_diff * 10)
             
-            # Hand detection for gesture counting
-            hand_results = self.hands.process(rgb_frame)
-            if hand_results.multi_hand_landmarks:
-                metrics['gesture_count'] = len(hand_results.multi_hand_landmarks)
+            # Hand landmarks for gesture counting
+            metrics['gesture_count'] = sum(
+                hand is not None for hand in (results.left_hand_landmarks, results.right_hand_landmarks)
+            )
             
             # Overall attention score
             metrics['attention_score'] = (
@@ -120,6 +138,12 @@ class VisionService:
             logger.error(f"Error in MediaPipe analysis: {e}")
             return self._get_default_metrics()
     
+    def _to_rgb(self, frame: np.ndarray) -> np.ndarray:
+        """BGR -> RGB into a buffer kept across frames of the same size, instead of a new array each time"""
+        if self._rgb_buffer is None or self._rgb_buffer.shape != frame.shape:
+            self._rgb_buffer = np.empty_like(frame)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+    
     def _analyze_with_opencv(self, frame: np.ndarray) -> Dict:
         """Analyze frame using OpenCV (fallback)"""
         try:
@@ -133,8 +157,12 @@ class VisionService:
             }
             
             if self.face_cascade is not None:
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                # A UMat keeps the conversion and detection on the OpenCL device
+                source = cv2.UMat(frame) if self.use_opencl else frame
+                gray = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
                 faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
+                if isinstance(faces, cv2.UMat):
+                    faces = faces.get()
                 
                 if len(faces) > 0:
                     metrics['face_detected'] = True
@@ -147,8 +175,7 @@ class VisionService:
                     face_center_x = (x + w/2) / frame.shape[1]
                     face_center_y = (y + h/2) / frame.shape[0]
                     
-                    center_distance = np.sqrt((face_center_x - 0.5)**2 + (face_center_y - 0.5)**2)
-                    metrics['eye_contact_score'] = max(0, 1 - center_distance * 2)
+                    metrics['eye_contact_score'] = eye_contact_score(face_center_x, face_center_y)
                     
                     # Simple attention score
                     metrics['attention_score'] = metrics['eye_contact_score'] * 0.7 + 0.3
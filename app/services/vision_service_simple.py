@@ -1,26 +1,52 @@
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import time
-import random
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Placeholder metrics are drawn this many frames at a time
+PLACEHOLDER_BATCH_SIZE = 1024
+
+# (low, high) of the uniform placeholder scores: eye contact, posture, attention
+_SCORE_LOW = np.array([0.6, 0.7, 0.65])
+_SCORE_HIGH = np.array([0.9, 0.95, 0.85])
+
 class VisionService:
     def __init__(self):
         self.mediapipe_available = False
         self.opencv_available = False
+        self._rng = np.random.default_rng()
+        self._batch: List[Tuple[float, float, float, int]] = []
+        self._batch_index = 0
         
         logger.info("Vision service initialized in simple mode (no MediaPipe/OpenCV)")
     
+    def _next_placeholder(self) -> Tuple[float, float, float, int]:
+        """Next (eye contact, posture, attention, gesture count) row, refilling the batch when used up"""
+        if self._batch_index >= len(self._batch):
+            scores = self._rng.uniform(_SCORE_LOW, _SCORE_HIGH, size=(PLACEHOLDER_BATCH_SIZE, 3))
+            gestures = self._rng.integers(0, 4, size=PLACEHOLDER_BATCH_SIZE)
+            self._batch = [
+                (eye, posture, attention, gesture)
+                for (eye, posture, attention), gesture in zip(scores.tolist(), gestures.tolist())
+            ]
+            self._batch_index = 0
+        row = self._batch[self._batch_index]
+        self._batch_index += 1
+        return row
+    
     def analyze_frame(self, frame) -> Dict:
         """Analyze a video frame for behavioral metrics (placeholder implementation)"""
         # Generate random but realistic-looking metrics for demo purposes
+        eye_contact, posture, attention, gestures = self._next_placeholder()
         return {
             'face_detected': True,
-            'eye_contact_score': random.uniform(0.6, 0.9),
-            'posture_score': random.uniform(0.7, 0.95),
-            'gesture_count': random.randint(0, 3),
-            'attention_score': random.uniform(0.65, 0.85),
+            'eye_contact_score': eye_contact,
+            'posture_score': posture,
+            'gesture_count': gestures,
+            'attention_score': attention,
             'timestamp': time.time()
         }
     
@@ -35,4 +61,3 @@ class VisionService:
             'opencv_available': False,
             'fully_functional': False
         }
-
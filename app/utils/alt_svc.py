@@ -0,0 +1,23 @@
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+class AltSvcMiddleware:
+    """Advertise an alternative (e.g. HTTP/2 or HTTP/3) endpoint on every HTTP response"""
+
+    def __init__(self, app: ASGIApp, alt_svc: Optional[str] = None):
+        self.app = app
+        self.alt_svc = alt_svc
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.alt_svc:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_alt_svc(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).setdefault("Alt-Svc", self.alt_svc)
+            await send(message)
+
+        await self.app(scope, receive, send_with_alt_svc)
@@ -0,0 +1,100 @@
+import logging
+from typing import Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Weights of the overall behavior score (attention, eye contact, posture)
+ATTENTION_WEIGHT = 0.4
+EYE_CONTACT_WEIGHT = 0.3
+POSTURE_WEIGHT = 0.3
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def _summarize_numpy(face, eye, posture, gestures, attention) -> Tuple:
+    """Vectorized fallback with the same results as the compiled kernel"""
+    n = len(attention)
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0, 0.0
+    mean_eye = float(eye.mean())
+    mean_posture = float(posture.mean())
+    mean_attention = float(attention.mean())
+    # Longest run of consecutive frames with a detected face
+    padded = np.concatenate(([False], face.astype(np.bool_), [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    longest_streak = int((edges[1::2] - edges[::2]).max()) if len(edges) else 0
+    overall = ATTENTION_WEIGHT * mean_attention + EYE_CONTACT_WEIGHT * mean_eye + POSTURE_WEIGHT * mean_posture
+    return (mean_eye, mean_posture, mean_attention, int(gestures.sum()),
+            float(attention.min()), float(attention.max()), float(attention.std()),
+            longest_streak, overall)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _summarize_numba(face, eye, posture, gestures, attention):
+        """Single pass over the columns: sums, attention extremes/variance and face streak"""
+        n = attention.shape[0]
+        if n == 0:
+            return 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0, 0.0
+        eye_sum = 0.0
+        posture_sum = 0.0
+        attention_sum = 0.0
+        attention_sq_sum = 0.0
+        gesture_total = 0
+        attention_min = attention[0]
+        attention_max = attention[0]
+        streak = 0
+        longest_streak = 0
+        for i in range(n):
+            a = attention[i]
+            eye_sum += eye[i]
+            posture_sum += posture[i]
+            attention_sum += a
+            attention_sq_sum += a * a
+            gesture_total += gestures[i]
+            if a < attention_min:
+                attention_min = a
+            if a > attention_max:
+                attention_max = a
+            if face[i]:
+                streak += 1
+                if streak > longest_streak:
+                    longest_streak = streak
+            else:
+                streak = 0
+        mean_eye = eye_sum / n
+        mean_posture = posture_sum / n
+        mean_attention = attention_sum / n
+        variance = max(attention_sq_sum / n - mean_attention * mean_attention, 0.0)
+        overall = ATTENTION_WEIGHT * mean_attention + EYE_CONTACT_WEIGHT * mean_eye + POSTURE_WEIGHT * mean_posture
+        return (mean_eye, mean_posture, mean_attention, gesture_total,
+                attention_min, attention_max, np.sqrt(variance), longest_streak, overall)
+
+# Python type of each summarize_behavior() field; the kernel's result layout is fixed, so
+# its values are converted positionally instead of probing each one for .item()
+_RESULT_TYPES = (float, float, float, int, float, float, float, int, float)
+
+def summarize_behavior(face: np.ndarray, eye: np.ndarray, posture: np.ndarray,
+                       gestures: np.ndarray, attention: np.ndarray) -> Tuple:
+    """Return (mean eye contact, mean posture, mean attention, total gestures, attention min,
+    attention max, attention std, longest face-detected streak, weighted overall score)"""
+    if NUMBA_AVAILABLE:
+        result = _summarize_numba(face, eye, posture, gestures, attention)
+        return tuple(convert(value) for convert, value in zip(_RESULT_TYPES, result))
+    return _summarize_numpy(face, eye, posture, gestures, attention)
+
+def warmup():
+    """Compile (or load the cached) kernel at startup so the first summary isn't cold"""
+    if not NUMBA_AVAILABLE:
+        return
+    try:
+        summarize_behavior(
+            np.zeros(1, dtype=np.bool_), np.zeros(1), np.zeros(1),
+            np.zeros(1, dtype=np.int32), np.zeros(1)
+        )
+    except Exception as e:
+        logger.error(f"Error compiling behavior kernel: {e}")
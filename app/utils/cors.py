@@ -0,0 +1,21 @@
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import Receive, Scope, Send
+
+class SelectiveCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware that skips same-origin traffic and static assets entirely"""
+
+    def __init__(self, app, skip_prefixes: tuple = ("/static/",), **kwargs):
+        super().__init__(app, **kwargs)
+        self.skip_prefixes = skip_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        # Browsers only send Origin on cross-origin (or CORS-mode) requests
+        if not any(name == b"origin" for name, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        await super().__call__(scope, receive, send)
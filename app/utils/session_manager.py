@@ -1,53 +1,325 @@
-import uuid
-import json
+import secrets
 import os
 import logging
-from typing import Dict, Optional
+import asyncio
+import heapq
+import struct
+import threading
+import time
+
+import anyio
+import orjson
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 from datetime import datetime, timedelta
-from app.models.session import InterviewSession, SessionStatus
+from app.models.session import (
+    CVData, InterviewSession, SessionStatus, dump_session, load_session,
+    session_record_seq, apply_session_delta
+)
 
 logger = logging.getLogger(__name__)
 
+# Writes append the changes since the previous write to the session's journal; after this
+# many entries the journal is folded into a fresh snapshot
+SESSION_JOURNAL_MAX_ENTRIES = int(os.getenv("SESSION_JOURNAL_MAX_ENTRIES", "100"))
+
+# Sessions kept in memory; beyond this the least recently used are written out and dropped
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+
+# IDs with no session on disk are remembered this long, so repeated lookups skip the filesystem
+SESSION_MISS_TTL_SECONDS = float(os.getenv("SESSION_MISS_TTL_SECONDS", "5"))
+SESSION_MISS_CACHE_SIZE = 4096
+
+# Snapshots at least this large are zstd-compressed when zstandard is installed; journal
+# entries are small deltas and stay uncompressed
+SESSION_COMPRESS_MIN_BYTES = int(os.getenv("SESSION_COMPRESS_MIN_BYTES", "65536"))
+SESSION_ZSTD_LEVEL = int(os.getenv("SESSION_ZSTD_LEVEL", "3"))
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Journal entries are dump_session() delta records, each preceded by its u32 length
+_JOURNAL_FRAME = struct.Struct("<I")
+
+class _Persisted(NamedTuple):
+    """What a session's files hold: the last record's seq and what it covers"""
+    seq: int
+    journal_entries: int
+    messages_nbytes: int
+    behavior_count: int
+    behavior_truncations: int
+    cv_data: Optional[CVData]
+
 class SessionManager:
     def __init__(self, storage_dir: str = "sessions"):
         self.storage_dir = storage_dir
-        self.active_sessions: Dict[str, InterviewSession] = {}
+        # LRU order, oldest first; guarded by _cache_lock together with the expiry heap
+        self.active_sessions: "OrderedDict[str, InterviewSession]" = OrderedDict()
+        # (deadline, session_id) of started sessions; stale entries are skipped when popped
+        self._expiry: List[Tuple[datetime, str]] = []
+        # Negative cache: session_id -> monotonic time its load found nothing
+        self._misses: "OrderedDict[str, float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Sessions changed in memory but not yet written; see mark_dirty()
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+        # Sessions whose initial question is being generated (in-process only, never persisted)
+        self._generating: Set[str] = set()
+        self._generating_lock = threading.Lock()
+        # Per session, the state last written; writes are serialized so deltas chain up.
+        # Taking a session out of _dirty also happens under this lock, so a session outside
+        # _dirty is never between "changed" and "written" (see _evict). Order: write, cache, dirty
+        self._persisted: Dict[str, _Persisted] = {}
+        self._write_lock = threading.RLock()
+        # Only used under _write_lock, as compressors are not thread-safe
+        self._compressor = zstandard.ZstdCompressor(level=SESSION_ZSTD_LEVEL) if ZSTD_AVAILABLE else None
         
         # Create storage directory if it doesn't exist
         os.makedirs(storage_dir, exist_ok=True)
+        # IDs with a snapshot or legacy file, listed once; saves and deletes keep it current
+        self._on_disk: Set[str] = {
+            entry.name.rsplit('.', 1)[0] for entry in os.scandir(storage_dir)
+            if entry.name.endswith(('.bin', '.json'))
+        }
     
     def create_session(self) -> str:
         """Create a new interview session"""
-        session_id = str(uuid.uuid4())
+        # 22 URL-safe characters from 128 random bits; matches the API's session ID pattern
+        session_id = secrets.token_urlsafe(16)
         session = InterviewSession(session_id=session_id)
         
-        self.active_sessions[session_id] = session
-        self._save_session(session)
+        self.mark_dirty(session)
         
         logger.info(f"Created new session: {session_id}")
         return session_id
     
     def get_session(self, session_id: str) -> Optional[InterviewSession]:
         """Get session by ID"""
-        if session_id in self.active_sessions:
-            return self.active_sessions[session_id]
+        with self._cache_lock:
+            session = self.active_sessions.get(session_id)
+            if session is not None:
+                self.active_sessions.move_to_end(session_id)
+                return session
+            missed_at = self._misses.get(session_id)
+            if missed_at is not None and time.monotonic() - missed_at < SESSION_MISS_TTL_SECONDS:
+                return None
         
         # Try to load from storage
         session = self._load_session(session_id)
-        if session:
-            self.active_sessions[session_id] = session
+        if not session:
+            with self._cache_lock:
+                self._misses[session_id] = time.monotonic()
+                self._misses.move_to_end(session_id)
+                while len(self._misses) > SESSION_MISS_CACHE_SIZE:
+                    self._misses.popitem(last=False)
+        else:
+            session = self._cache(session, replace=False)
+            if session.status == SessionStatus.ACTIVE:
+                self._schedule_expiry(session)
         
         return session
     
+    async def aget_session(self, session_id: str) -> Optional[InterviewSession]:
+        """get_session for the event loop: in-memory hits return directly, loads run in a thread"""
+        session = self.active_sessions.get(session_id)
+        if session is not None:
+            return session
+        return await anyio.to_thread.run_sync(self.get_session, session_id)
+    
+    def _cache(self, session: InterviewSession, replace: bool = True, dirty: bool = False) -> InterviewSession:
+        """Make session the most recently used entry, optionally marking it dirty.
+        
+        With replace=False an instance already cached under the same ID wins and is returned.
+        Never writes or evicts, as it is called from the event loop; the flusher trims the
+        cache to SESSION_CACHE_SIZE after each write (see _evict).
+        """
+        with self._cache_lock:
+            self._misses.pop(session.session_id, None)
+            cached = self.active_sessions.get(session.session_id)
+            if cached is session or (cached is not None and not replace):
+                # Already resident (the usual get_session -> update_session round trip)
+                session = cached
+            else:
+                self.active_sessions[session.session_id] = session
+            self.active_sessions.move_to_end(session.session_id)
+            if dirty:
+                # Under the cache lock, so _evict can't drop it between the two steps
+                with self._dirty_lock:
+                    self._dirty.add(session.session_id)
+            return session
+    
+    def _evict(self):
+        """Drop the least recently used sessions beyond SESSION_CACHE_SIZE.
+        
+        Runs in the flusher's thread with _write_lock held. Only sessions without unwritten
+        changes are dropped; dirty ones stay until a flush has written them.
+        """
+        with self._write_lock, self._cache_lock:
+            excess = len(self.active_sessions) - SESSION_CACHE_SIZE
+            if excess <= 0:
+                return
+            victims = []
+            with self._dirty_lock:
+                for session_id in self.active_sessions:
+                    if len(victims) == excess:
+                        break
+                    if session_id not in self._dirty:
+                        victims.append(session_id)
+            for session_id in victims:
+                del self.active_sessions[session_id]
+                self._persisted.pop(session_id, None)
+    
+    def _schedule_expiry(self, session: InterviewSession):
+        """Queue a started session for cleanup_expired_sessions at the end of its time limit"""
+        if session.start_time:
+            deadline = session.start_time + timedelta(seconds=session.max_duration_seconds)
+            with self._cache_lock:
+                heapq.heappush(self._expiry, (deadline, session.session_id))
+    
     def update_session(self, session: InterviewSession) -> bool:
-        """Update session data"""
-        try:
-            self.active_sessions[session.session_id] = session
-            self._save_session(session)
+        """Update session data; written by the next periodic flush"""
+        self.mark_dirty(session)
+        return True
+    
+    def persist_session(self, session: InterviewSession) -> bool:
+        """Update session data and write it to storage now"""
+        with self._write_lock:
+            try:
+                self._cache(session)
+                with self._dirty_lock:
+                    self._dirty.discard(session.session_id)
+                self._save_session(session)
+                return True
+            except Exception as e:
+                logger.error(f"Error updating session {session.session_id}: {e}")
+                # Leave it to the flusher to retry
+                with self._dirty_lock:
+                    self._dirty.add(session.session_id)
+                return False
+    
+    def persist_sessions(self, sessions: List[InterviewSession]) -> int:
+        """Write several sessions now, syncing them as one batch; returns how many were written"""
+        with self._write_lock:
+            with self._dirty_lock:
+                for session in sessions:
+                    self._dirty.discard(session.session_id)
+            
+            # Pass 1: journal entries are appended and snapshots go to temp files, all unsynced
+            staged, appended, failed = [], [], []
+            for session in sessions:
+                state = self._persisted.get(session.session_id)
+                try:
+                    if self._needs_snapshot(session, state):
+                        path = self._session_path(session.session_id)
+                        temp_file = self._temp_path(path)
+                        try:
+                            data, new_state = self._snapshot_record(session, state.seq + 1 if state else 0)
+                            with open(temp_file, 'wb') as f:
+                                f.write(data)
+                        except Exception:
+                            self._discard_temp(temp_file)
+                            raise
+                        staged.append((session, temp_file, path, new_state))
+                    else:
+                        self._append_journal(session, state, sync=False)
+                        appended.append(self._journal_path(session.session_id))
+                except Exception as e:
+                    logger.error(f"Error saving session {session.session_id}: {e}")
+                    failed.append(session.session_id)
+            
+            # Pass 2: make the written files durable before any rename can expose them. Only
+            # this batch's files: os.sync() would flush every filesystem on the host
+            for path in appended + [temp_file for _, temp_file, _, _ in staged]:
+                with open(path, 'rb+') as f:
+                    os.fsync(f.fileno())
+            for session, temp_file, path, new_state in staged:
+                try:
+                    os.replace(temp_file, path)
+                    self._on_disk.add(session.session_id)
+                    self._remove_file(self._journal_path(session.session_id))
+                    self._persisted[session.session_id] = new_state
+                except Exception as e:
+                    logger.error(f"Error saving session {session.session_id}: {e}")
+                    self._discard_temp(temp_file)
+                    failed.append(session.session_id)
+            # Once per batch: covers the renames and any journal created by this batch
+            if staged or appended:
+                self._sync_storage_dir()
+            
+            # Leave failed writes to the next flush
+            if failed:
+                with self._dirty_lock:
+                    self._dirty.update(failed)
+        return len(sessions) - len(failed)
+    
+    def try_mark_generating(self, session_id: str) -> bool:
+        """Atomically claim initial-question generation; False if another task already holds it"""
+        with self._generating_lock:
+            if session_id in self._generating:
+                return False
+            self._generating.add(session_id)
             return True
-        except Exception as e:
-            logger.error(f"Error updating session {session.session_id}: {e}")
-            return False
+    
+    def clear_generating(self, session_id: str):
+        """Release the claim taken by try_mark_generating"""
+        with self._generating_lock:
+            self._generating.discard(session_id)
+    
+    def mark_dirty(self, session: InterviewSession):
+        """Record an in-memory change; the write is deferred to the next flush"""
+        self._cache(session, dirty=True)
+    
+    def flush_dirty(self) -> int:
+        """Write every session marked dirty since the last flush, then trim the cache.
+        
+        Returns how many sessions were written.
+        """
+        with self._write_lock:
+            with self._dirty_lock:
+                dirty = list(self._dirty)
+            sessions = [self.active_sessions.get(session_id) for session_id in dirty]
+            sessions = [session for session in sessions if session is not None]
+            # Batched: each tick fsyncs only the files it wrote, plus the storage directory once
+            written = self.persist_sessions(sessions) if sessions else 0
+            self._evict()
+        return written
+    
+    def flush(self, session_id: str) -> bool:
+        """Write one session now if it has deferred changes; returns whether it was written"""
+        with self._write_lock:
+            with self._dirty_lock:
+                if session_id not in self._dirty:
+                    return False
+                self._dirty.discard(session_id)
+            session = self.active_sessions.get(session_id)
+            if session is None:
+                return False
+            try:
+                self._save_session(session)
+                return True
+            except Exception as e:
+                logger.error(f"Error flushing session {session_id}: {e}")
+                # Leave it to the periodic flush to retry
+                with self._dirty_lock:
+                    self._dirty.add(session_id)
+                return False
+    
+    async def run_flusher(self, interval: float = 0.25):
+        """Periodically flush dirty sessions off the event loop until cancelled"""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                if self._dirty or len(self.active_sessions) > SESSION_CACHE_SIZE:
+                    await anyio.to_thread.run_sync(self.flush_dirty)
+                if self._expiry and self._expiry[0][0] <= datetime.now():
+                    await anyio.to_thread.run_sync(self.cleanup_expired_sessions)
+        finally:
+            # Final write so deferred changes survive shutdown
+            self.flush_dirty()
     
     def start_session(self, session_id: str) -> bool:
         """Start an interview session"""
@@ -57,6 +329,7 @@ class SessionManager:
         
         session.status = SessionStatus.ACTIVE
         session.start_time = datetime.now()
+        self._schedule_expiry(session)
         
         return self.update_session(session)
     
@@ -66,50 +339,73 @@ class SessionManager:
         if not session:
             return False
         
+        self._mark_ended(session)
+        
+        # A finished interview is written right away rather than on the next flush
+        return self.persist_session(session)
+    
+    def _mark_ended(self, session: InterviewSession):
+        """Set the completed status, end time and duration in memory"""
         session.status = SessionStatus.COMPLETED
         session.end_time = datetime.now()
         
         if session.start_time:
             duration = session.end_time - session.start_time
             session.duration_seconds = int(duration.total_seconds())
-        
-        return self.update_session(session)
     
     def is_session_expired(self, session_id: str) -> bool:
-        """Check if session has exceeded time limit"""
-        session = self.get_session(session_id)
+        """Check if session has exceeded time limit; only looks at sessions already in memory"""
+        session = self.active_sessions.get(session_id)
         if not session or not session.start_time:
             return False
         
-        elapsed = datetime.now() - session.start_time
-        return elapsed.total_seconds() > session.max_duration_seconds
+        return session.elapsed_seconds() > session.max_duration_seconds
     
     def cleanup_expired_sessions(self):
-        """Clean up expired sessions"""
+        """Clean up expired sessions, popping due deadlines off the expiry heap"""
         expired_sessions = []
+        now = datetime.now()
         
-        for session_id, session in self.active_sessions.items():
-            if session.start_time:
-                elapsed = datetime.now() - session.start_time
-                if elapsed.total_seconds() > session.max_duration_seconds:
-                    session.status = SessionStatus.EXPIRED
-                    expired_sessions.append(session_id)
+        with self._cache_lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, session_id = heapq.heappop(self._expiry)
+                session = self.active_sessions.get(session_id)
+                # Entries of evicted, deleted or already ended sessions are dropped here
+                if session is None or session.status != SessionStatus.ACTIVE or not session.start_time:
+                    continue
+                deadline = session.start_time + timedelta(seconds=session.max_duration_seconds)
+                if deadline > now:
+                    # Restarted or given more time since it was queued
+                    heapq.heappush(self._expiry, (deadline, session_id))
+                    continue
+                session.status = SessionStatus.EXPIRED
+                expired_sessions.append(session)
         
-        for session_id in expired_sessions:
-            self.end_session(session_id)
-            logger.info(f"Session {session_id} expired and cleaned up")
+        # End them all in memory first, then write them as one batch
+        for session in expired_sessions:
+            self._mark_ended(session)
+        if expired_sessions:
+            self.persist_sessions(expired_sessions)
+        for session in expired_sessions:
+            logger.info(f"Session {session.session_id} expired and cleaned up")
     
     def delete_session(self, session_id: str) -> bool:
         """Delete a session and its data"""
         try:
-            # Remove from active sessions
-            if session_id in self.active_sessions:
-                del self.active_sessions[session_id]
+            # Remove from active sessions; its expiry entry is skipped once due
+            with self._cache_lock:
+                self.active_sessions.pop(session_id, None)
+            with self._dirty_lock:
+                self._dirty.discard(session_id)
+            
+            with self._write_lock:
+                self._persisted.pop(session_id, None)
+                self._on_disk.discard(session_id)
             
-            # Remove from storage
-            session_file = os.path.join(self.storage_dir, f"{session_id}.json")
-            if os.path.exists(session_file):
-                os.remove(session_file)
+            # Remove from storage (snapshot, journal and any legacy JSON file)
+            for session_file in (self._session_path(session_id), self._journal_path(session_id),
+                                 self._legacy_session_path(session_id)):
+                self._remove_file(session_file)
             
             logger.info(f"Deleted session: {session_id}")
             return True
@@ -118,64 +414,204 @@ class SessionManager:
             logger.error(f"Error deleting session {session_id}: {e}")
             return False
     
+    def _session_path(self, session_id: str) -> str:
+        return os.path.join(self.storage_dir, f"{session_id}.bin")
+    
+    def _legacy_session_path(self, session_id: str) -> str:
+        return os.path.join(self.storage_dir, f"{session_id}.json")
+    
+    def _journal_path(self, session_id: str) -> str:
+        return os.path.join(self.storage_dir, f"{session_id}.log")
+    
     def _save_session(self, session: InterviewSession):
-        """Save session to storage"""
+        """Save session to storage: append a delta to its journal, or write a new snapshot"""
         try:
-            session_file = os.path.join(self.storage_dir, f"{session.session_id}.json")
-            
-            # Convert session to dict for JSON serialization
-            session_dict = session.dict()
-
-            def convert_datetimes(obj):
-                if isinstance(obj, datetime):
-                    return obj.isoformat()
-                if isinstance(obj, list):
-                    return [convert_datetimes(item) for item in obj]
-                if isinstance(obj, dict):
-                    return {k: convert_datetimes(v) for k, v in obj.items()}
-                return obj
-
-            serializable = convert_datetimes(session_dict)
-
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(serializable, f, indent=2, ensure_ascii=False)
+            with self._write_lock:
+                state = self._persisted.get(session.session_id)
+                if self._needs_snapshot(session, state):
+                    self._write_snapshot(session, state.seq + 1 if state else 0)
+                else:
+                    self._append_journal(session, state)
                 
         except Exception as e:
             logger.error(f"Error saving session {session.session_id}: {e}")
             raise
     
+    def _needs_snapshot(self, session: InterviewSession, state: Optional[_Persisted]) -> bool:
+        """Whether the next write must be a snapshot rather than a journal entry"""
+        return (state is None or state.journal_entries >= SESSION_JOURNAL_MAX_ENTRIES
+                or session.messages.nbytes < state.messages_nbytes
+                or session.behavior_metrics.truncations != state.behavior_truncations)
+    
+    def _write_snapshot(self, session: InterviewSession, seq: int):
+        """Write the whole session atomically, then drop the journal it supersedes"""
+        data, state = self._snapshot_record(session, seq)
+        self._write_atomic(self._session_path(session.session_id), data)
+        self._on_disk.add(session.session_id)
+        
+        # Entries left behind by a crash right here have lower seqs and are skipped on load
+        self._remove_file(self._journal_path(session.session_id))
+        self._persisted[session.session_id] = state
+    
+    def _snapshot_record(self, session: InterviewSession, seq: int) -> Tuple[bytes, _Persisted]:
+        """Serialize the whole session; returns the record and the state it leaves on disk"""
+        # Read the ends first: the event loop may append while this thread serializes
+        messages_nbytes, behavior_count = session.messages.nbytes, len(session.behavior_metrics)
+        truncations, cv_data = session.behavior_metrics.truncations, session.cv_data
+        data = dump_session(session, seq=seq, messages_to=messages_nbytes, behavior_to=behavior_count)
+        if self._compressor is not None and len(data) >= SESSION_COMPRESS_MIN_BYTES:
+            data = self._compressor.compress(data)
+        return data, _Persisted(seq, 0, messages_nbytes, behavior_count, truncations, cv_data)
+    
+    def _append_journal(self, session: InterviewSession, state: _Persisted, sync: bool = True):
+        """Append the messages, behavior rows and fields changed since state as one journal entry.
+        
+        With sync=False the caller is responsible for syncing the journal.
+        """
+        messages_nbytes, behavior_count = session.messages.nbytes, len(session.behavior_metrics)
+        cv_data = session.cv_data
+        record = dump_session(
+            session, seq=state.seq + 1,
+            messages_from=state.messages_nbytes, messages_to=messages_nbytes,
+            behavior_from=state.behavior_count, behavior_to=behavior_count,
+            include_cv=cv_data is not state.cv_data
+        )
+        try:
+            with open(self._journal_path(session.session_id), 'ab') as f:
+                f.write(_JOURNAL_FRAME.pack(len(record)) + record)
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except Exception:
+            # The journal may end in a partial entry now; start over from a snapshot next time
+            self._persisted[session.session_id] = state._replace(journal_entries=SESSION_JOURNAL_MAX_ENTRIES)
+            raise
+        self._persisted[session.session_id] = _Persisted(
+            state.seq + 1, state.journal_entries + 1, messages_nbytes, behavior_count,
+            state.behavior_truncations, cv_data
+        )
+    
+    def _write_atomic(self, path: str, data: bytes):
+        """Replace path with data: readers and crashes see the old or the new file, never part of one"""
+        temp_file = self._temp_path(path)
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, path)
+        except Exception:
+            self._discard_temp(temp_file)
+            raise
+    
+    def _remove_file(self, path: str):
+        """Remove path if it exists"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    
+    def _temp_path(self, path: str) -> str:
+        # Unique per writer, as the flusher thread and a request thread may save the same session
+        return f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    
+    def _discard_temp(self, temp_file: str):
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+    
+    def _sync_storage_dir(self):
+        """fsync the storage directory so completed renames survive a crash"""
+        try:
+            fd = os.open(self.storage_dir, os.O_RDONLY)
+        except OSError:
+            # Directories can't be opened for fsync on Windows
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def _replay_journal(self, session: InterviewSession, seq: int) -> Tuple[int, int, bool]:
+        """Apply the session's journal on top of its snapshot.
+        
+        Returns (entries read, seq of the last applied record, whether the journal was
+        intact); replay stops at a torn or out-of-sequence entry.
+        """
+        try:
+            with open(self._journal_path(session.session_id), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0, seq, True
+        
+        view = memoryview(data)
+        offset = entries = 0
+        while offset < len(data):
+            if offset + _JOURNAL_FRAME.size > len(data):
+                break
+            (length,) = _JOURNAL_FRAME.unpack_from(view, offset)
+            offset += _JOURNAL_FRAME.size
+            if offset + length > len(data):
+                break
+            try:
+                applied = apply_session_delta(session, view[offset:offset + length], seq)
+            except Exception as e:
+                logger.warning(f"Unreadable journal entry for session {session.session_id}: {e}")
+                applied = None
+            if applied is None:
+                break
+            seq = applied
+            entries += 1
+            offset += length
+        else:
+            return entries, seq, True
+        
+        logger.warning(f"Journal of session {session.session_id} ends early after {entries} entries")
+        return entries, seq, False
+    
     def _load_session(self, session_id: str) -> Optional[InterviewSession]:
         """Load session from storage"""
+        if session_id not in self._on_disk:
+            return None
         try:
-            session_file = os.path.join(self.storage_dir, f"{session_id}.json")
+            try:
+                with open(self._session_path(session_id), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = None
+            if data is not None:
+                if data[:len(_ZSTD_MAGIC)] == _ZSTD_MAGIC:
+                    if not ZSTD_AVAILABLE:
+                        raise ValueError("snapshot is zstd-compressed but zstandard is not installed")
+                    data = zstandard.ZstdDecompressor().decompress(data)
+                session = load_session(data)
+                entries, seq, intact = self._replay_journal(session, session_record_seq(data))
+                with self._write_lock:
+                    # A damaged journal can't be appended to; the next write snapshots instead
+                    self._persisted[session_id] = _Persisted(
+                        seq, entries if intact else SESSION_JOURNAL_MAX_ENTRIES,
+                        session.messages.nbytes, len(session.behavior_metrics),
+                        session.behavior_metrics.truncations, session.cv_data
+                    )
+                return session
             
-            if not os.path.exists(session_file):
+            # Fall back to sessions saved by older versions as JSON
+            # ISO timestamps are coerced by the models (pydantic fields, msgspec records)
+            try:
+                with open(self._legacy_session_path(session_id), 'rb') as f:
+                    session_dict = orjson.loads(f.read())
+            except FileNotFoundError:
                 return None
+            session = InterviewSession(**session_dict)
             
-            with open(session_file, 'r') as f:
-                session_dict = json.load(f)
-            
-            # Handle datetime deserialization
-            datetime_fields = ['start_time', 'end_time']
-            for field in datetime_fields:
-                if session_dict.get(field):
-                    session_dict[field] = datetime.fromisoformat(session_dict[field])
-            
-            # Handle nested datetime fields
-            if session_dict.get('cv_data', {}).get('parsed_at'):
-                session_dict['cv_data']['parsed_at'] = datetime.fromisoformat(
-                    session_dict['cv_data']['parsed_at']
-                )
-            
-            for message in session_dict.get('messages', []):
-                if message.get('timestamp'):
-                    message['timestamp'] = datetime.fromisoformat(message['timestamp'])
-            
-            for metric in session_dict.get('behavior_metrics', []):
-                if metric.get('timestamp'):
-                    metric['timestamp'] = datetime.fromisoformat(metric['timestamp'])
-            
-            return InterviewSession(**session_dict)
+            # Migrate it, so later loads read the binary snapshot instead of parsing JSON again
+            try:
+                with self._write_lock:
+                    self._write_snapshot(session, 0)
+            except Exception as e:
+                logger.warning(f"Could not migrate legacy session {session_id}: {e}")
+            return session
             
         except Exception as e:
             logger.error(f"Error loading session {session_id}: {e}")
@@ -196,3 +632,6 @@ class SessionManager:
             'behavior_metrics_count': len(session.behavior_metrics)
         }
 
+# Process-wide instance shared by the HTTP and WebSocket routers, so active_sessions
+# acts as one coherent in-memory cache in front of the session files
+session_manager = SessionManager()
@@ -0,0 +1,95 @@
+import os
+import re
+import stat
+import time
+import threading
+import logging
+from collections import OrderedDict
+from mimetypes import guess_type
+from typing import Optional, Tuple
+
+import anyio
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+logger = logging.getLogger(__name__)
+
+# Assets whose name carries a content hash (e.g. app.3f9a1c2b.js) never change in place
+HASHED_ASSET_PATTERN = re.compile(r'\.[0-9a-f]{8,}\.[A-Za-z0-9]+$')
+
+# Precompressed variants in order of preference: (Accept-Encoding token, file suffix)
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with cached stat() lookups, precompressed variants and Cache-Control headers"""
+
+    def __init__(self, *args, max_age: int = 3600, immutable_max_age: int = 31536000,
+                 stat_ttl: float = 60.0, stat_cache_size: int = 512, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+        self.immutable_max_age = immutable_max_age
+        self.stat_ttl = stat_ttl
+        self.stat_cache_size = stat_cache_size
+        self._stat_cache: "OrderedDict[str, Tuple[float, Tuple[str, Optional[os.stat_result]]]]" = OrderedDict()
+        self._stat_lock = threading.Lock()
+
+    def lookup_path(self, path: str) -> Tuple[str, Optional[os.stat_result]]:
+        """Resolve a path, reusing the stat result for up to stat_ttl seconds"""
+        now = time.monotonic()
+        with self._stat_lock:
+            cached = self._stat_cache.get(path)
+            if cached and now - cached[0] < self.stat_ttl:
+                self._stat_cache.move_to_end(path)
+                return cached[1]
+
+        result = super().lookup_path(path)
+
+        with self._stat_lock:
+            self._stat_cache[path] = (now, result)
+            self._stat_cache.move_to_end(path)
+            while len(self._stat_cache) > self.stat_cache_size:
+                self._stat_cache.popitem(last=False)
+        return result
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """Serve a precompressed variant when the client accepts it"""
+        if scope["method"] in ("GET", "HEAD"):
+            accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+            for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                if encoding not in accept_encoding:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    return self._encoded_file_response(path, full_path, stat_result, scope, encoding)
+
+        response = await super().get_response(path, scope)
+        self._set_cache_headers(path, response)
+        return response
+
+    def _encoded_file_response(self, path: str, full_path: str, stat_result: os.stat_result,
+                               scope: Scope, encoding: str) -> Response:
+        """Build a response for a precompressed file, typed as the original asset"""
+        media_type = guess_type(path)[0] or "text/plain"
+        response = FileResponse(
+            full_path,
+            media_type=media_type,
+            stat_result=stat_result,
+            method=scope["method"],
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            response = NotModifiedResponse(response.headers)
+        self._set_cache_headers(path, response)
+        return response
+
+    def _set_cache_headers(self, path: str, response: Response):
+        """Long-lived immutable caching for hashed assets, revalidation via ETag otherwise"""
+        if response.status_code not in (200, 304):
+            return
+        if HASHED_ASSET_PATTERN.search(path):
+            response.headers["Cache-Control"] = f"public, max-age={self.immutable_max_age}, immutable"
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={self.max_age}"
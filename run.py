@@ -32,6 +32,15 @@ def main():
             host="localhost",
             port=8000,
             log_level="info",
+            # One process: sessions, their journals and WebSocket connections live in its memory.
+            # uvicorn[standard] provides uvloop and httptools, which "auto" picks when importable
+            workers=1,
+            loop="auto",
+            http="auto",
+            # Per-request access lines are opt-in
+            access_log=os.getenv("ACCESS_LOG", "0") == "1",
+            timeout_keep_alive=int(os.getenv("KEEP_ALIVE_SECONDS", "75")),
+            ws_per_message_deflate=os.getenv("WS_PER_MESSAGE_DEFLATE", "0") == "1",
             reload=False  # Set to True for development
         )
     except KeyboardInterrupt:
@@ -1,5 +1,10 @@
 // Interview Page JavaScript
 
+// Binary WebSocket frames: the first byte is the frame type, the payload follows
+const FRAME_AUDIO = 0x01;
+const FRAME_VIDEO = 0x02;
+const FRAME_AI_AUDIO = 0x03; // followed by a big-endian uint32 sentence number, then WAV audio
+
 class InterviewSession {
     constructor(sessionId) {
         this.sessionId = sessionId;
@@ -13,6 +18,9 @@ class InterviewSession {
         this.questions = [];
         this.totalQuestions = 0;
         this.questionsAsked = 0;
+        this.pendingResponse = null; // interviewer message being streamed in
+        this.audioQueue = []; // sentence audio waiting to play, in reply order
+        this.audioPlaying = false;
         
         // DOM elements
         this.timer = document.getElementById('timer');
@@ -201,6 +209,7 @@ class InterviewSession {
         const wsUrl = `${protocol}//${window.location.host}/ws/${this.sessionId}`;
         
         this.websocket = new WebSocket(wsUrl);
+        this.websocket.binaryType = 'arraybuffer';
         
         this.websocket.onopen = () => {
             console.log('WebSocket connected');
@@ -208,8 +217,17 @@ class InterviewSession {
         };
         
         this.websocket.onmessage = (event) => {
+            if (event.data instanceof ArrayBuffer) {
+                this.handleBinaryMessage(event.data);
+                return;
+            }
             const message = JSON.parse(event.data);
-            this.handleWebSocketMessage(message);
+            // The server coalesces queued messages into a single 'batch' frame
+            if (message.type === 'batch') {
+                message.messages.forEach((item) => this.handleWebSocketMessage(item));
+            } else {
+                this.handleWebSocketMessage(message);
+            }
         };
         
         this.websocket.onclose = () => {
@@ -228,10 +246,19 @@ class InterviewSession {
             case 'transcription':
                 this.addMessage('candidate', message.text);
                 break;
+            case 'ai_response_delta':
+                if (!this.pendingResponse) {
+                    this.pendingResponse = this.addMessage('interviewer', '').querySelector('.message-text');
+                }
+                this.pendingResponse.textContent += message.text;
+                this.chatMessages.scrollTop = this.chatMessages.scrollHeight;
+                break;
             case 'ai_response':
-                this.addMessage('interviewer', message.text);
-                if (message.audio) {
-                    this.playAudioResponse(message.audio);
+                if (this.pendingResponse) {
+                    this.pendingResponse.textContent = message.text;
+                    this.pendingResponse = null;
+                } else {
+                    this.addMessage('interviewer', message.text);
                 }
                 try { this.questionsAsked += 1; } catch (e) { this.questionsAsked = 1; }
                 this.renderPlannedQuestions();
@@ -248,6 +275,23 @@ class InterviewSession {
         }
     }
 
+    handleBinaryMessage(buffer) {
+        const frameType = new Uint8Array(buffer, 0, 1)[0];
+        if (frameType === FRAME_AI_AUDIO) {
+            // Sentences arrive in reply order, so the sequence number only matters for debugging
+            this.audioQueue.push(new Blob([buffer.slice(5)], { type: 'audio/wav' }));
+            if (!this.audioPlaying) {
+                this.playNextAudioChunk();
+            }
+        }
+    }
+
+    sendBinaryFrame(frameType, blob) {
+        if (this.websocket && this.websocket.readyState === WebSocket.OPEN) {
+            this.websocket.send(new Blob([new Uint8Array([frameType]), blob]));
+        }
+    }
+
     startVideoAnalysis() {
         if (!this.stream) return;
         
@@ -262,18 +306,10 @@ class InterviewSession {
             
             ctx.drawImage(this.webcamVideo, 0, 0);
             
-            // Convert canvas to blob and send via WebSocket
+            // Convert canvas to blob and send it as a binary frame
             canvas.toBlob((blob) => {
-                if (blob && this.websocket && this.websocket.readyState === WebSocket.OPEN) {
-                    const reader = new FileReader();
-                    reader.onload = () => {
-                        const base64Data = reader.result.split(',')[1];
-                        this.websocket.send(JSON.stringify({
-                            type: 'video',
-                            data: base64Data
-                        }));
-                    };
-                    reader.readAsDataURL(blob);
+                if (blob) {
+                    this.sendBinaryFrame(FRAME_VIDEO, blob);
                 }
             }, 'image/jpeg', 0.8);
             
@@ -418,20 +454,7 @@ class InterviewSession {
         
         try {
             const audioBlob = new Blob(this.audioChunks, { type: 'audio/webm' });
-            const reader = new FileReader();
-            
-            reader.onload = () => {
-                const base64Data = reader.result.split(',')[1];
-                
-                if (this.websocket && this.websocket.readyState === WebSocket.OPEN) {
-                    this.websocket.send(JSON.stringify({
-                        type: 'audio',
-                        data: base64Data
-                    }));
-                }
-            };
-            
-            reader.readAsDataURL(audioBlob);
+            this.sendBinaryFrame(FRAME_AUDIO, audioBlob);
             
         } catch (error) {
             console.error('Failed to process recording:', error);
@@ -483,27 +506,22 @@ class InterviewSession {
         
         this.chatMessages.appendChild(messageDiv);
         this.chatMessages.scrollTop = this.chatMessages.scrollHeight;
+        return messageDiv;
     }
 
-    playAudioResponse(base64Audio) {
-        try {
-            const audioData = atob(base64Audio);
-            const audioArray = new Uint8Array(audioData.length);
-            for (let i = 0; i < audioData.length; i++) {
-                audioArray[i] = audioData.charCodeAt(i);
-            }
-            
-            const audioBlob = new Blob([audioArray], { type: 'audio/wav' });
-            const audioUrl = URL.createObjectURL(audioBlob);
-            const audio = new Audio(audioUrl);
-            
-            audio.play().catch(error => {
-                console.error('Failed to play audio response:', error);
-            });
-            
-        } catch (error) {
-            console.error('Failed to process audio response:', error);
+    playNextAudioChunk() {
+        const audioBlob = this.audioQueue.shift();
+        if (!audioBlob) {
+            this.audioPlaying = false;
+            return;
         }
+        this.audioPlaying = true;
+        const audio = new Audio(URL.createObjectURL(audioBlob));
+        audio.addEventListener('ended', () => this.playNextAudioChunk());
+        audio.play().catch(error => {
+            console.error('Failed to play audio chunk:', error);
+            this.playNextAudioChunk();
+        });
     }
 
     updateBehaviorMetrics(metrics) {